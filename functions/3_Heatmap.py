@@ -1,30 +1,23 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-from scipy.stats import gaussian_kde
 import plotly.graph_objects as go
 import os
+from functions.heatmap_cache import HeatmapCache
+from functions.kde import KDE_ENGINES
+from functions.shot_index import ShotIndex, SHOT_FILTERS
+from functions.datasets import CLEANED_DATA, load_dataset, source_signature
 
 # -----------------------------
 # Load Data
 # -----------------------------
 current_dir = os.path.dirname(os.path.abspath(__file__))
-current_file = os.path.join(current_dir, '4.Cleaned_data.csv')
-datos = pd.read_csv(current_file)
+current_file = CLEANED_DATA
+# Same signature as the dataset artifact, so the heatmap cache and the artifact are invalidated together
+dataset_version = source_signature(current_file)
 
-# -----------------------------
-# Helper Functions
-# -----------------------------
-def value_for_other_team(row):
-    if row['homeTeamId'] == row['teamId']:
-        return row['awayTeamId']
-    elif row['awayTeamId'] == row['teamId']:
-        return row['homeTeamId']
-    else:
-        return None  
-
-datos['other_team'] = datos.apply(value_for_other_team, axis=1)
-datos['shot_teamId'] = datos['teamId']
+# Shared read-only frame: memory-mapped Feather artifact with the opponent column already derived,
+# rebuilt from the CSV only when the CSV changes - reruns and new sessions do not re-parse anything
+datos = load_dataset(current_file)
 
 # Define teams and matches
 teams = {
@@ -54,50 +47,43 @@ match_dict = {
     # ... (add all your matches here)
 }
 
-# Define filters
-filters = {
-    'Goals Scored': lambda team_id: datos[(datos['shot_isGoal'] == 1) & (datos['shot_type'] != 'Penalty') & (datos['shot_teamId'] == team_id)],
-    'Goals Conceded': lambda team_id: datos[(datos['shot_isGoal'] == 1) & (datos['shot_type'] != 'Penalty') & (datos['other_team'] == team_id)],
-    'Exclusions Drawn': lambda team_id: datos[(datos['exclusion_byId'] > 0) & (datos['shot_teamId'] == team_id)],
-    'Blocks Made': lambda team_id: datos[(datos['shot_blockedById'] > 0) & (datos['shot_teamId'] == team_id)],
-    'Goals Direct From Foul': lambda team_id: datos[(datos['shot_isDirectFromFoul'] == 1) & (datos['shot_teamId'] == team_id)],
-    'Missed Shots': lambda team_id: datos[(datos['shot_isGoal'] == 0) & (datos['shot_teamId'] == team_id)],
-    'Power Play Goals Scored': lambda team_id: datos[(datos['shot_type'] == 'Power_Play') & (datos['shot_isGoal'] == 1) & (datos['shot_teamId'] == team_id)],
-    'Power Play Goals Conceded': lambda team_id: datos[(datos['shot_type'] == 'Power_Play') & (datos['shot_isGoal'] == 1) & (datos['other_team'] == team_id)],
-    'Regular Attack Goals Scored': lambda team_id: datos[(datos['shot_type'] == 'Regular_Attack') & (datos['shot_isGoal'] == 1) & (datos['shot_teamId'] == team_id)],
-    'Regular Attack Goals Conceded': lambda team_id: datos[(datos['shot_type'] == 'Regular_Attack') & (datos['shot_isGoal'] == 1) & (datos['other_team'] == team_id)],
-}
+# Define filters: predicate names + team column, resolved through the precomputed shot index
+filters = SHOT_FILTERS
+
+@st.cache_resource
+def get_shot_index(version):
+    return ShotIndex(datos)
 
 # -----------------------------
 # Functions for Heatmap
 # -----------------------------
-def filter_for_match_values(datos, match_id):
-    if match_id != 0:
-        return datos[datos['matchId'] == match_id]
-    return datos
+# Evaluation grid shared by every heatmap (300 x 300 points over the normalised pitch)
+heatmap_grid = np.linspace(0, 1, 300)
 
-def shot_map_create(team_id, value, match_id):
-    goals_df = filters[value](team_id)
-    x_shots = filter_for_match_values(goals_df, match_id)['locationX'].fillna(0).replace(np.inf, 0)
-    y_shots = filter_for_match_values(goals_df, match_id)['locationY'].fillna(0).replace(np.inf, 0)
+# engine: 'fft' (binned, flat cost in the number of shots) or 'exact' (direct gaussian_kde evaluation)
+def shot_map_create(team_id, value, match_id, engine="fft"):
+    x_shots, y_shots = shot_index.shots(value, team_id, match_id)
 
     if len(x_shots) < 1 or len(y_shots) < 1 or (x_shots.sum() == 0 and y_shots.sum() == 0):
         return None, None, None
 
-    xy = np.vstack([x_shots, y_shots])
+    x_grid = heatmap_grid
+    y_grid = heatmap_grid
     try:
         bw_method = 0.6 if len(x_shots) < 50 else 0.3
-        kde = gaussian_kde(xy, bw_method=bw_method)
+        Z = KDE_ENGINES[engine](x_shots, y_shots, x_grid, y_grid, bw_method)
     except ValueError:
         return None, None, None
 
-    x_grid = np.linspace(0, 1, 300)
-    y_grid = np.linspace(0, 1, 300)
-    X, Y = np.meshgrid(x_grid, y_grid)
-    positions = np.vstack([X.ravel(), Y.ravel()])
-    Z = np.reshape(kde(positions).T, X.shape)
     return x_grid, y_grid, Z
 
+# Density grids are cached per (team, filter, match, engine)
+def cached_shot_map(heatmap_cache, team_id, value, match_id, engine="fft"):
+    Z = heatmap_cache.get_or_compute((team_id, value, match_id, engine), lambda: shot_map_create(team_id, value, match_id, engine)[2])
+    if Z is None:
+        return None, None, None
+    return heatmap_grid, heatmap_grid, Z
+
 def get_shot_map(x_grid, y_grid, Z, selected_value):
     fig = go.Figure()
     if Z is None or x_grid is None or y_grid is None:
@@ -136,11 +122,38 @@ def get_shot_map(x_grid, y_grid, Z, selected_value):
     )
     return fig
 
+# -----------------------------
+# Heatmap cache
+# -----------------------------
+# One cache per process, warmed from disk; the dataset version invalidates grids of an older CSV.
+# Sized to hold every (team, filter, match, engine) key, so "Precompute all heatmaps" never evicts its own grids.
+heatmap_cache_file = os.path.join(current_dir, 'heatmap_cache.npz')
+
+@st.cache_resource
+def get_heatmap_cache(version, maxsize):
+    heatmap_cache = HeatmapCache(maxsize=maxsize, version=version)
+    heatmap_cache.load(heatmap_cache_file)
+    return heatmap_cache
+
+heatmap_cache = get_heatmap_cache(dataset_version, len(teams) * len(filters) * len(match_dict) * len(KDE_ENGINES))
+shot_index = get_shot_index(dataset_version)
+
 # -----------------------------
 # Streamlit UI
 # -----------------------------
 st.title("Water Polo Champions League Heatmap")
 
+kde_engine = st.sidebar.selectbox("KDE engine", list(KDE_ENGINES.keys()))
+
+if st.sidebar.button("Precompute all heatmaps"):
+    with st.spinner("Computing heatmaps..."):
+        heatmap_cache.warm(
+            [(team, value, match, kde_engine) for team in teams.values() for value in filters for match in match_dict.values()],
+            lambda team, value, match, engine: shot_map_create(team, value, match, engine)[2],
+        )
+        heatmap_cache.save(heatmap_cache_file)
+    st.sidebar.success(f"{len(heatmap_cache)} heatmaps cached")
+
 selected_team = st.selectbox("Select Team", list(teams.keys()))
 selected_value = st.selectbox("Select Value", list(filters.keys()))
 selected_match = st.selectbox("Select Match", list(match_dict.keys()))
@@ -148,7 +161,7 @@ selected_match = st.selectbox("Select Match", list(match_dict.keys()))
 team_id = teams[selected_team]
 match_id = match_dict[selected_match]
 
-x_grid, y_grid, Z = shot_map_create(team_id, selected_value, match_id)
+x_grid, y_grid, Z = cached_shot_map(heatmap_cache, team_id, selected_value, match_id, kde_engine)
 fig = get_shot_map(x_grid, y_grid, Z, selected_value)
 
 st.plotly_chart(fig, use_container_width=True)
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from streamlit_drawable_canvas import st_canvas
 from PIL import Image
+from functions.canvas import CanvasTracker, normalise_point
 
 st.title("🥅 Goal Shot Map")
 
@@ -9,6 +10,14 @@ st.title("🥅 Goal Shot Map")
 if "shots" not in st.session_state:
     st.session_state.shots = pd.DataFrame(columns=["x_shot", "y_shot", "x_location", "y_location", "Outcome"])
 
+# Canvas objects already ingested, per canvas key - each rerun only looks at new clicks/lines.
+# The shots table is rebuilt from what the canvases collected, so a toolbar undo removes the click.
+# Own tracker: the Data Entry page clears its tracker on every submit.
+if "shot_map_tracker" not in st.session_state:
+    st.session_state.shot_map_tracker = CanvasTracker()
+tracker = st.session_state.shot_map_tracker
+tracker.start_run()
+
 # Inputs
 col1, col2 = st.columns(2)
 with col1:
@@ -49,26 +58,17 @@ if shot_outcome == "Goal" or shot_outcome == "Save" or shot_outcome == "Miss":
         key="pitch_canvas",
     )
 
-    # Add shots when user clicks
-    if canvas_result1.json_data is not None:
-        for obj in canvas_result1.json_data["objects"]:
-            x_shot, y_shot = obj["left"], obj["top"]
-            # Only add new clicks (avoid duplicates)
-            if not any((st.session_state.shots["x_shot"] == x_shot) & (st.session_state.shots["y_shot"] == y_shot)):
-                new_shot = pd.DataFrame([{"x_shot": x_shot, "y_shot": y_shot, "Outcome": shot_outcome}])
-                st.session_state.shots = pd.concat([st.session_state.shots, new_shot], ignore_index=True)
-
-    if canvas_result2.json_data is not None:
-        for obj in canvas_result2.json_data["objects"]:
-            x_location, y_location = obj["left"], obj["top"]
-            # Match with existing shots without location
-            if not any((st.session_state.shots["x_location"] == x_location) & (st.session_state.shots["y_location"] == y_location)):
-                mask = st.session_state.shots["x_location"].isnull() & st.session_state.shots["y_location"].isnull()
-                st.session_state.shots.loc[mask, "x_location"] = x_location
-                st.session_state.shots.loc[mask, "y_location"] = y_location
-
-    # Show data
-    st.dataframe(st.session_state.shots)
+    # Shots from the goal clicks - only clicks not ingested yet are converted (fractions of the canvas)
+    tracker.collect("goal_canvas", canvas_result1.json_data, lambda objects, indices: [
+        dict(zip(["x_shot", "y_shot"], normalise_point(obj["left"], obj["top"], 800, 300)), Outcome=shot_outcome)
+        for obj in objects
+    ], keep=True)
+
+    # Pitch clicks, matched with the shots in click order
+    tracker.collect("pitch_canvas", canvas_result2.json_data, lambda objects, indices: [
+        dict(zip(["x_location", "y_location"], normalise_point(obj["left"], obj["top"], 800, 800)))
+        for obj in objects
+    ], keep=True)
 
 if shot_outcome == "Block":
     st.info("Block outcome selected. No shot location needed.")
@@ -87,26 +87,31 @@ if shot_outcome == "Block":
         width=800,
         update_streamlit=True,
         drawing_mode="point",  # Clicks only
-        key="pitch_canvas",
+        key="block_pitch_canvas",
     )
 
 
-    if canvas_result2.json_data is not None:
-        for obj in canvas_result2.json_data["objects"]:
-            x_shot, y_shot = None, None
-            x_location, y_location = obj["left"], obj["top"]
-            # Match with existing shots without location
-            if not any((st.session_state.shots["x_location"] == x_location) & (st.session_state.shots["y_location"] == y_location)):
-                new_shot = pd.DataFrame([{"x_location": x_location, "y_location": y_location, "Outcome": shot_outcome}])
-                st.session_state.shots = pd.concat([st.session_state.shots, new_shot], ignore_index=True)
+    # Pitch clicks become blocked shots without a goal position
+    tracker.collect("block_pitch_canvas", canvas_result2.json_data, lambda objects, indices: [
+        dict(zip(["x_location", "y_location"], normalise_point(obj["left"], obj["top"], 800, 800)), Outcome=shot_outcome)
+        for obj in objects
+    ], keep=True)
 
-    # Show data
-    st.dataframe(st.session_state.shots)
+# Shots table: goal clicks with their pitch location, then blocked shots
+locations = tracker.items("pitch_canvas")
+goal_shots = [{**shot, **(locations[i] if i < len(locations) else {})} for i, shot in enumerate(tracker.items("goal_canvas"))]
+st.session_state.shots = pd.DataFrame(goal_shots + tracker.items("block_pitch_canvas"),
+                                      columns=["x_shot", "y_shot", "x_location", "y_location", "Outcome"])
+
+# Show data
+st.dataframe(st.session_state.shots)
 
 import streamlit as st
 import pandas as pd
 from streamlit_drawable_canvas import st_canvas
 import math
+from functions.ingest import to_parquet_bytes, to_feather_bytes
+from functions.canvas import CanvasTracker, normalise_point
 
 st.title("🏐 Pass Map")
 
@@ -117,9 +122,13 @@ if "pass_map" not in st.session_state:
 if "temp_click" not in st.session_state:
     st.session_state.temp_click = []  # store start/end clicks
 
-# Player positions in an arc (7 players)
+# Lines already added to the pass map - each rerun only ingests newly drawn lines
+if "pass_map_tracker" not in st.session_state:
+    st.session_state.pass_map_tracker = CanvasTracker()
+
+# Player positions in an arc (7 players), as fractions of the 600 x 500 canvas
 player_positions = {
-    f"Player {i+1}": (200 + 150*math.cos(math.pi*(i-3)/6), 400 - 150*math.sin(math.pi*(i-3)/6))
+    f"Player {i+1}": normalise_point(200 + 150*math.cos(math.pi*(i-3)/6), 400 - 150*math.sin(math.pi*(i-3)/6), 600, 500)
     for i in range(7)
 }
 
@@ -140,24 +149,15 @@ canvas_result = st_canvas(
     key="pass_canvas",
 )
 
-if canvas_result.json_data is not None:
-    objects = canvas_result.json_data.get("objects", [])
-    if objects:
-        for obj in objects:
-            x1 = obj['left'] + obj['x1']
-            y1 = obj['top'] + obj['y1']
-            x2 = obj['left'] + obj['x2']
-            y2 = obj['top'] + obj['y2']
-            st.session_state.temp_click = pd.DataFrame(
-                [[x1, y1, x2, y2]],
-                columns=["From_X", "From_Y", "To_X", "To_Y"]
-            )
-            if not ((st.session_state.pass_map[['From_X','From_Y','To_X','To_Y']]
-                == st.session_state.temp_click.iloc[0]).all(axis=1).any()):
-                st.session_state.pass_map = pd.concat(
-                    [st.session_state.pass_map, st.session_state.temp_click],
-                    ignore_index=True
-                )
+# Pass map rebuilt from the lines the canvas collected - new lines are converted once, an undo removes its line
+lines = st.session_state.pass_map_tracker.collect("pass_canvas", canvas_result.json_data, lambda objects, indices: [
+    [*normalise_point(obj['left'] + obj['x1'], obj['top'] + obj['y1'], 600, 500),
+     *normalise_point(obj['left'] + obj['x2'], obj['top'] + obj['y2'], 600, 500)]
+    for obj in objects
+])
+st.session_state.pass_map = pd.DataFrame(lines, columns=["From_X", "From_Y", "To_X", "To_Y"]).reindex(
+    columns=["From_X", "From_Y", "To_X", "To_Y", "From_Player", "To_Player"]
+)
 
 
 st.dataframe(st.session_state.pass_map)
@@ -252,4 +252,16 @@ st.download_button(
     data=csv,
     file_name="water_polo_events.csv",
     mime="text/csv"
+)
+st.download_button(
+    label="📥 Export Events as Parquet",
+    data=to_parquet_bytes(st.session_state.substitutions),
+    file_name="water_polo_events.parquet",
+    mime="application/vnd.apache.parquet"
+)
+st.download_button(
+    label="📥 Export Events as Feather",
+    data=to_feather_bytes(st.session_state.substitutions),
+    file_name="water_polo_events.feather",
+    mime="application/vnd.apache.arrow.file"
 )
\ No newline at end of file
@@ -0,0 +1,44 @@
+import streamlit as st
+from functions.ingest import file_hash, file_kind, load_events
+from functions.match_session import live_session
+from functions.shot_distribution import SHOT_GROUPS, bin_shots, conversion_table, match_zone_counts, total_counts, zone_figure
+
+st.title("🎯 Shot Distribution")
+
+# Match archive (one or many matches) - shots are binned once per file, grouping and grid size
+uploaded_file = st.file_uploader("Upload a CSV, Parquet or Feather export", type=["csv", "parquet", "feather"])
+
+col1, col2, col3 = st.columns(3)
+grouping = col1.selectbox("Group by", list(SHOT_GROUPS))
+zone_rows = col2.slider("Zone rows", 1, 5, 3)
+zone_cols = col3.slider("Zone columns", 1, 5, 3)
+by = SHOT_GROUPS[grouping]
+zones = (zone_rows, zone_cols)
+
+if uploaded_file is not None:
+    uploaded_bytes = uploaded_file.getvalue()
+    data_hash = file_hash(uploaded_bytes)
+    counts = match_zone_counts(data_hash, by, zones, load_events(data_hash, file_kind(uploaded_file.name), uploaded_bytes))
+elif live_session() is not None:
+    counts = bin_shots(live_session().to_frame(), by, zones)
+else:
+    st.info("Upload a match export or capture events on the Data Entry page.")
+    st.stop()
+
+if not counts:
+    st.info("No shots recorded yet.")
+    st.stop()
+
+matches = sorted({match for match, _ in counts})
+selected_matches = st.multiselect("Matches", matches, default=matches)
+
+# Season-wide numbers: sum of the small per-match zone arrays, no rescan of the events
+totals = total_counts(counts, set(selected_matches))
+
+st.write("### Conversion Rates")
+table = conversion_table(totals, by)
+st.dataframe(table)
+
+if totals:
+    label = st.selectbox("Goal zones for", list(totals), format_func=lambda label: " - ".join(label) if isinstance(label, tuple) else label)
+    st.plotly_chart(zone_figure(totals[label], zones), use_container_width=True)
@@ -0,0 +1,44 @@
+import streamlit as st
+from functions.ingest import file_hash, file_kind, load_events
+from functions.match_session import live_session
+from functions.pass_network import NETWORK_EVENTS, aggregate, build_networks, centrality, match_networks, network_figure, players, retag_passes
+from functions.schema import TEAMS
+
+st.title("🕸️ Pass Network")
+
+# Match archive (one or many matches) - passes are parsed and counted once per file
+uploaded_file = st.file_uploader("Upload a CSV, Parquet or Feather export", type=["csv", "parquet", "feather"])
+
+# Player names stored with each pass come from the template at capture time; re-tagging re-resolves
+# every pass endpoint against the current templates
+retag = st.sidebar.checkbox("Re-tag passes with current templates")
+
+if uploaded_file is not None:
+    uploaded_bytes = uploaded_file.getvalue()
+    data_hash = file_hash(uploaded_bytes)
+    networks = match_networks(data_hash, retag, load_events(data_hash, file_kind(uploaded_file.name), uploaded_bytes))
+elif live_session() is not None:
+    df = live_session().to_frame()
+    networks = build_networks(df.assign(passes=retag_passes(df)) if retag else df)
+else:
+    st.info("Upload a match export or capture events on the Data Entry page.")
+    st.stop()
+
+if not networks:
+    st.info("No passes recorded yet.")
+    st.stop()
+
+col1, col2 = st.columns(2)
+team = col1.radio("Team", TEAMS, horizontal=True)
+event = col2.radio("Event", NETWORK_EVENTS, horizontal=True)
+
+matches = sorted({match for match, _, _ in networks})
+selected_matches = st.multiselect("Matches", matches, default=matches)
+
+# Several matches: sum of their sparse pass matrices
+network = aggregate(networks, team, event, set(selected_matches))
+
+st.plotly_chart(network_figure(network, event, title=f"{team} {event} Pass Network"), use_container_width=True)
+
+st.write("### Player Centrality")
+st.dataframe(centrality(network, players(event)))
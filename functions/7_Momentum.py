@@ -0,0 +1,44 @@
+import streamlit as st
+from functions.ingest import file_hash, file_kind, load_events
+from functions.match_session import live_session
+from functions.momentum import HALF_LIFE, momentum_series, momentum_figure
+from functions.schema import TEAMS
+
+st.title("📈 Momentum")
+
+# Match archive (one or many matches) - parsed once per file
+uploaded_file = st.file_uploader("Upload a CSV, Parquet or Feather export", type=["csv", "parquet", "feather"])
+
+half_life = st.slider("Half-life (seconds)", 30, 300, int(HALF_LIFE), step=15)
+countdown = st.checkbox("Clock shows time remaining in the period")
+
+if uploaded_file is not None:
+    uploaded_bytes = uploaded_file.getvalue()
+    df = load_events(file_hash(uploaded_bytes), file_kind(uploaded_file.name), uploaded_bytes)
+elif live_session() is not None:
+    df = live_session().to_frame()
+else:
+    st.info("Upload a match export or capture events on the Data Entry page.")
+    st.stop()
+
+# One vectorised pass over the whole archive, every match at once
+series = momentum_series(df, half_life=half_life, countdown=countdown)
+
+if series.empty:
+    st.info("No timed events yet.")
+    st.stop()
+
+matches = sorted(series["match"].unique())
+match = st.selectbox("Match", matches) if len(matches) > 1 else matches[0]
+match_series = series[series["match"] == match]
+
+st.plotly_chart(momentum_figure(match_series), use_container_width=True)
+
+# Momentum at the end of the match and the largest swing in each team's favour
+col1, col2 = st.columns(2)
+col1.metric(f"{TEAMS[0]} final momentum", f"{match_series[TEAMS[0]].iloc[-1]:.2f}",
+            delta=f"Peak lead: {match_series['net'].max():.2f}")
+col2.metric(f"{TEAMS[1]} final momentum", f"{match_series[TEAMS[1]].iloc[-1]:.2f}",
+            delta=f"Peak lead: {-match_series['net'].min():.2f}")
+
+st.dataframe(match_series)
@@ -0,0 +1,60 @@
+import os
+import streamlit as st
+import pandas as pd
+from functions.datasets import CLEANED_DATA
+from functions.ingest import file_hash, file_kind, load_events
+from functions.match_session import live_session
+from functions.score_model import MODEL_PATH, ScorePredictor, load_model, train_from_dataset
+from functions.schema import TEAMS
+
+st.title("🔮 Score Prediction")
+
+# Trained parameters - read once per version of the model file
+model = load_model()
+
+if model.get("source_signature") is None:
+    st.info("No trained model found - using default priors.")
+
+# Offline training on the cleaned Champions League dataset, serialised next to it
+if os.path.exists(CLEANED_DATA) and st.sidebar.button("Train on Champions League data"):
+    with st.spinner("Training..."):
+        train_from_dataset(CLEANED_DATA, MODEL_PATH)
+    st.rerun()
+
+st.write("### Model")
+col1, col2 = st.columns(2)
+col1.metric("Expected attempts per team", f"{model['attempts']['alpha'] / model['attempts']['beta']:.1f}")
+col2.metric("Match length (min)", f"{model['match_seconds'] / 60:.0f}")
+st.dataframe(pd.DataFrame({
+    "Attempt share": model["attempt_mix"],
+    "Conversion log-odds": model["conversion"],
+}))
+
+# Match to replay: an uploaded export or the events captured on the Data Entry page
+uploaded_file = st.file_uploader("Upload a CSV, Parquet or Feather export", type=["csv", "parquet", "feather"])
+
+if uploaded_file is not None:
+    uploaded_bytes = uploaded_file.getvalue()
+    df = load_events(file_hash(uploaded_bytes), file_kind(uploaded_file.name), uploaded_bytes)
+elif live_session() is not None:
+    df = live_session().to_frame()
+else:
+    st.stop()
+
+# Prediction after every event, replayed through the same O(1) updates the live page uses
+predictor = ScorePredictor(model)
+trajectory = []
+for row in df.to_dict("records"):
+    predictor.add(row)
+    trajectory.append({"minute": predictor.elapsed / 60, **predictor.predictions()})
+
+if not trajectory:
+    st.info("No events yet.")
+    st.stop()
+
+st.write("### Predicted Final Score")
+col1, col2 = st.columns(2)
+for col, team in zip([col1, col2], TEAMS):
+    col.metric(team, predictor.goals[team], delta=f"Pred: {predictor.predict(team):.1f}")
+
+st.line_chart(pd.DataFrame(trajectory), x="minute", y=TEAMS)
@@ -0,0 +1,25 @@
+import streamlit as st
+from PIL import Image
+
+from functions.datasets import source_signature
+
+
+# Resize function: Scales images to fit canvas max dimensions while preserving aspect ratio
+def resize_for_canvas(img, max_w=800, max_h=500):
+    w, h = img.size
+    scale = min(max_w/w, max_h/h, 1.0)  # Never upscale, fit within bounds
+    new_w, new_h = int(w*scale), int(h*scale)
+    return img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+
+
+# Decoded and resized once per (file, file version, bounds) for the whole process
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _load_background(path, signature, max_w, max_h):
+    with Image.open(path) as img:
+        return resize_for_canvas(img, max_w, max_h)
+
+
+# Canvas background image, shared by every session and rerun - treat it as read-only.
+# Editing the file on disk changes its signature, so the next call decodes it again.
+def canvas_background(path, max_w=800, max_h=500):
+    return _load_background(path, source_signature(path), max_w, max_h)
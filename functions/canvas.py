@@ -0,0 +1,91 @@
+# Canvas clicks are stored as fractions of the canvas size (x from the left, y from the top, both in [0, 1]),
+# so events captured on different images or screens can be aggregated directly.
+
+def normalise_point(x, y, width, height):
+    return x / width, y / height
+
+
+# Last point clicked on a width x height point-drawing canvas, normalised - (None, None) when nothing was clicked
+def last_point(json_data, width, height):
+    objects = (json_data or {}).get("objects", [])
+    if not objects:
+        return None, None
+    return normalise_point(objects[-1]["left"], objects[-1]["top"], width, height)
+
+
+# Geometry of a canvas object - two objects with the same fingerprint are the same click/line
+def fingerprint(obj):
+    return (obj.get("type"), obj.get("left"), obj.get("top"), obj.get("x1"), obj.get("y1"), obj.get("x2"), obj.get("y2"))
+
+
+class CanvasTracker:
+    """Remembers which objects of each canvas (by canvas key) were already ingested.
+
+    A canvas returns all of its objects on every rerun; `new_objects` only hands back
+    the ones past the processed count, skipping fingerprints already seen. When the
+    canvas shrinks (undo/clear in the toolbar) the key starts over and every remaining
+    object is new again, so callers should go through `collect`, which rebuilds its
+    list from the current objects instead of appending to it.
+
+    Pages whose canvases come and go between reruns call `start_run` first and pass
+    `keep=True`: when such a canvas is drawn again (empty), the items collected from
+    its previous instance are kept rather than dropped.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._seen = {}
+        self._collected = {}
+        self._kept = {}  # items of earlier instances of a canvas (keep=True)
+        self._rendered = set()  # canvas keys collected in this run
+        self._previous = set()  # ... and in the run before
+
+    def reset(self, key):
+        self._counts.pop(key, None)
+        self._seen.pop(key, None)
+        self._collected.pop(key, None)
+
+    def clear(self):
+        self._counts.clear()
+        self._seen.clear()
+        self._collected.clear()
+        self._kept.clear()
+
+    # Call once at the top of every script run that uses keep=True
+    def start_run(self):
+        self._previous, self._rendered = self._rendered, set()
+
+    # (index, object) pairs not ingested yet
+    def new_objects(self, key, json_data):
+        objects = (json_data or {}).get("objects", [])
+        if len(objects) < self._counts.get(key, 0):
+            self.reset(key)
+        start = self._counts.get(key, 0)
+        seen = self._seen.setdefault(key, set())
+        fresh = []
+        for index in range(start, len(objects)):
+            obj = objects[index]
+            key_print = fingerprint(obj)
+            if key_print not in seen:
+                seen.add(key_print)
+                fresh.append((index, obj))
+        self._counts[key] = len(objects)
+        return fresh
+
+    # Running list of converted items for a canvas: `convert(objects, indices)` is only called on new objects,
+    # or on all remaining ones after an undo/clear
+    def collect(self, key, json_data, convert, keep=False):
+        if keep and key in self._collected and key not in self._previous:  # canvas drawn again after a rerun without it
+            self._kept.setdefault(key, []).extend(self._collected[key])
+            self.reset(key)
+        self._rendered.add(key)
+        fresh = self.new_objects(key, json_data)
+        collected = self._collected.setdefault(key, [])
+        if fresh:
+            indices, objects = zip(*fresh)
+            collected.extend(convert(list(objects), list(indices)))
+        return self.items(key)
+
+    # Items collected for a canvas so far, without looking at the canvas
+    def items(self, key):
+        return self._kept.get(key, []) + self._collected.get(key, [])
@@ -0,0 +1,191 @@
+import atexit
+import threading
+import time
+
+from tenacity import Retrying, stop_after_attempt, wait_exponential
+
+
+class CaptureQueueFull(RuntimeError):
+    pass
+
+
+# Identity of a captured event: the match, the writer (entry tab) and its sequence number in that match
+def event_key(row):
+    return row.get("match"), row.get("writer"), row.get("seq")
+
+
+class CaptureQueue:
+    """In-memory ring buffer of captured events, flushed to an EventStore by a background thread.
+
+    `enqueue` only stores the row with the next sequence number and returns, so
+    submit latency does not depend on the database. The worker writes batches in
+    capture order, retrying with exponential backoff; a batch that keeps failing
+    stays at the head of the buffer and is retried on the next pass - nothing is
+    dropped. When the buffer is full `enqueue` raises CaptureQueueFull instead of
+    overwriting unsaved events. `cancel` never waits for the writer or touches the
+    store: an event in the batch being written is marked and left out of every
+    (re)try, and an event already stored is queued for deletion - the worker
+    deletes it with the same retries as a write.
+    """
+
+    def __init__(self, store, capacity=1024, batch_size=64, flush_interval=0.2, attempts=5):
+        self.store = store
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.attempts = attempts
+
+        self._slots = [None] * capacity  # ring buffer of (seq, row)
+        self._head = 0  # oldest unsaved event
+        self._count = 0
+        self._writing = 0  # events at the head currently being written
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # held while a batch is written
+        self._cancelled = set()  # event keys undone while their batch was being written
+        self._deletes = []  # event keys already written when undone, still to delete from the store
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+        self.next_seq = 1
+        self.flushed_seq = 0  # every event up to this sequence number is in the store
+        self.failures = 0
+        self.last_error = None
+
+        self._thread = threading.Thread(target=self._run, name="capture-queue", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # Add an event; returns its sequence number
+    def enqueue(self, row):
+        with self._lock:
+            if self._count >= self.capacity:
+                raise CaptureQueueFull(f"{self._count} events waiting to be saved")
+            seq = self.next_seq
+            self.next_seq += 1
+            self._slots[(self._head + self._count) % self.capacity] = (seq, row)
+            self._count += 1
+        self._wake.set()
+        return seq
+
+    # Events not saved yet (and not undone), oldest first
+    def pending(self):
+        with self._lock:
+            rows = [self._slots[(self._head + i) % self.capacity][1] for i in range(self._count)]
+            return [row for row in rows if event_key(row) not in self._cancelled]
+
+    def status(self):
+        with self._lock:
+            return {
+                "pending": self._count,
+                "pending_deletes": len(self._deletes),
+                "flushed_seq": self.flushed_seq,
+                "failures": self.failures,
+                "last_error": self.last_error,
+            }
+
+    # Undo one event of a match: dropped from the buffer if still unsaved, marked if its batch is being
+    # written, otherwise queued for the worker to delete from the store
+    def cancel(self, match, writer, seq):
+        key = (match, writer, seq)
+        with self._lock:
+            for i in range(self._count):
+                slot = (self._head + i) % self.capacity
+                if event_key(self._slots[slot][1]) != key:
+                    continue
+                if i < self._writing:
+                    self._cancelled.add(key)
+                    return
+                # Close the gap: shift the newer events one slot back
+                for j in range(i, self._count - 1):
+                    self._slots[(self._head + j) % self.capacity] = self._slots[(self._head + j + 1) % self.capacity]
+                self._slots[(self._head + self._count - 1) % self.capacity] = None
+                self._count -= 1
+                return
+            if key not in self._deletes:  # not buffered: already committed
+                self._deletes.append(key)
+        self._wake.set()
+
+    # Match of the most recent event, buffered or stored
+    def latest_match(self):
+        pending = self.pending()
+        return pending[-1].get("match") if pending else self.store.latest_match()
+
+    # Stored events of a match (default: the latest one) plus the ones still in the buffer, as one consistent snapshot
+    def load_events(self, match=None):
+        with self._flush_lock:
+            match = self.latest_match() if match is None else match
+            pending = self.pending()
+            stored = self.store.load_events(match)
+            with self._lock:
+                deleted = set(self._deletes)
+        return [row for row in stored if event_key(row) not in deleted] + [row for row in pending if row.get("match") == match]
+
+    # Write everything still buffered (and apply queued deletes), blocking until done (or `timeout` seconds)
+    def flush(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while (self._count or self._deletes) and (deadline is None or time.monotonic() < deadline):
+            self._wake.set()
+            time.sleep(self.flush_interval / 4)
+        return not (self._count or self._deletes)
+
+    def close(self):
+        if not self._stopped.is_set():
+            self.flush(timeout=5)
+            self._stopped.set()
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            while (self._count or self._deletes) and not self._stopped.is_set():
+                if not self._write_batch():
+                    self._stopped.wait(min(2 ** self.failures * self.flush_interval, 30))  # back off, keep the batch
+
+    # Rows of a batch that were not undone meanwhile
+    def _live_rows(self, batch):
+        with self._lock:
+            return [row for _, row in batch if event_key(row) not in self._cancelled]
+
+    def _write_batch(self):
+        with self._flush_lock:
+            with self._lock:
+                self._writing = min(self._count, self.batch_size)
+                batch = [self._slots[(self._head + i) % self.capacity] for i in range(self._writing)]
+                deletes = list(self._deletes)
+            try:
+                for attempt in Retrying(
+                    stop=stop_after_attempt(self.attempts),
+                    wait=wait_exponential(multiplier=self.flush_interval, max=5),
+                    reraise=True,
+                ):
+                    with attempt:
+                        for key in deletes:  # undone after they were written
+                            self.store.delete_event(*key)
+                        with self._lock:
+                            self._deletes = [key for key in self._deletes if key not in deletes]
+                        deletes = []
+                        rows = self._live_rows(batch)
+                        if rows:
+                            self.store.insert_events(rows)
+            except Exception as error:  # storage down: keep the batch for the next pass
+                with self._lock:
+                    self._writing = 0
+                    self.failures += 1
+                    self.last_error = f"{type(error).__name__}: {error}"
+                return False
+
+            with self._lock:
+                written = {event_key(row) for row in rows}
+                self._deletes.extend(key for key in self._cancelled if key in written)  # cancelled mid-write
+                self._cancelled.difference_update(event_key(row) for _, row in batch)
+                for i in range(len(batch)):
+                    self._slots[(self._head + i) % self.capacity] = None
+                self._head = (self._head + len(batch)) % self.capacity
+                self._count -= len(batch)
+                self._writing = 0
+                if batch:
+                    self.flushed_seq = batch[-1][0]
+                self.failures = 0
+                self.last_error = None
+            return True
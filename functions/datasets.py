@@ -0,0 +1,74 @@
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Cleaned Champions League dataset used by the heatmap and player radar pages
+CLEANED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '4.Cleaned_data.csv')
+
+
+# Derived team columns of the cleaned Champions League shot table:
+# shot_teamId is the shooting team, other_team the opponent (NA when the team is neither home nor away)
+def add_team_columns(datos):
+    home = datos['homeTeamId']
+    away = datos['awayTeamId']
+    team = datos['teamId']
+    datos['other_team'] = away.where(home == team, home.where(away == team)).astype("Int64")
+    datos['shot_teamId'] = team
+    return datos
+
+
+# -----------------------------
+# Preprocessed dataset artifacts
+# -----------------------------
+# A CSV is converted once into an uncompressed Feather file next to it (preprocessing applied).
+# The Feather file is memory-mapped and the resulting frame is shared read-only by every session
+# of the process; it is rebuilt when the source CSV's mtime or size changes.
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def artifact_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".feather"
+
+
+def _artifact_signature(path):
+    if not os.path.exists(path):
+        return None
+    metadata = feather.read_table(path, memory_map=True, columns=[]).schema.metadata or {}
+    return metadata.get(b"source_signature", b"").decode()
+
+
+def build_artifact(csv_path, prepare=add_team_columns):
+    signature = source_signature(csv_path)
+    table = pa.Table.from_pandas(prepare(pd.read_csv(csv_path)), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"source_signature": signature.encode()})
+    path = artifact_path(csv_path)
+    tmp_path = path + ".tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")  # uncompressed so it can be memory-mapped
+    os.replace(tmp_path, path)
+    return path
+
+
+# Process-wide, read-only frame for a CSV dataset. Do not mutate the returned frame.
+def load_dataset(csv_path, prepare=add_team_columns):
+    signature = source_signature(csv_path)
+    with _datasets_lock:
+        cached = _datasets.get(csv_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        path = artifact_path(csv_path)
+        if _artifact_signature(path) != signature:
+            build_artifact(csv_path, prepare)
+        frame = feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+        _datasets[csv_path] = (signature, frame)
+        return frame
@@ -0,0 +1,66 @@
+import pandas as pd
+import pyarrow as pa
+
+from functions.schema import EVENT_SCHEMA, EVENT_COLUMNS, ARROW_SCHEMA
+
+
+# Build a typed DataFrame from a dict of column lists
+def _build_frame(columns):
+    return pd.DataFrame({
+        column: pd.Series(values, dtype=EVENT_SCHEMA[column])
+        for column, values in columns.items()
+    }, columns=EVENT_COLUMNS)
+
+
+class EventLog:
+    """Append-only event log with typed columns.
+
+    New events go into per-column list buffers. Every `chunk_size` events the
+    buffer is sealed into a typed DataFrame chunk, so appending never copies the
+    events already stored. `to_frame()` / `to_arrow()` build one snapshot on demand.
+    """
+
+    def __init__(self, chunk_size=256):
+        self.chunk_size = chunk_size
+        self._chunks = []
+        self._sealed = None  # concatenation of self._chunks, built lazily
+        self._buffer = {column: [] for column in EVENT_COLUMNS}
+        self._buffered = 0
+        self._snapshot = None
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._chunks) + self._buffered
+
+    def append(self, row):
+        for column in EVENT_COLUMNS:
+            self._buffer[column].append(row.get(column))
+        self._buffered += 1
+        self._snapshot = None
+        if self._buffered >= self.chunk_size:
+            self._seal()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    # Move the buffered rows into a typed chunk
+    def _seal(self):
+        self._chunks.append(_build_frame(self._buffer))
+        self._buffer = {column: [] for column in EVENT_COLUMNS}
+        self._buffered = 0
+        self._sealed = None
+
+    def to_frame(self):
+        if self._snapshot is None:
+            if self._sealed is None and self._chunks:
+                self._sealed = pd.concat(self._chunks, ignore_index=True)
+            if self._sealed is None:
+                self._snapshot = _build_frame(self._buffer)
+            elif self._buffered:
+                self._snapshot = pd.concat([self._sealed, _build_frame(self._buffer)], ignore_index=True)
+            else:
+                self._snapshot = self._sealed
+        return self._snapshot
+
+    def to_arrow(self):
+        return pa.Table.from_pandas(self.to_frame(), schema=ARROW_SCHEMA, preserve_index=False)
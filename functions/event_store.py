@@ -0,0 +1,171 @@
+from sqlalchemy import create_engine, event, make_url, text
+from sqlalchemy.pool import QueuePool
+
+from functions.schema import EVENT_SCHEMA
+
+# SQLite column types for the event schema (passes live in their own table)
+_SQL_TYPES = {"string": "TEXT", "Int64": "INTEGER", "float64": "REAL"}
+EVENT_FIELDS = [column for column in EVENT_SCHEMA if column != "passes"]
+PASS_FIELDS = ["pass_id", "from_x", "from_y", "from_player", "to_x", "to_y", "to_player"]
+# Who captured the event and their sequence number - identifies an event across entry tabs
+WRITER_FIELDS = ["writer", "seq"]
+# Unit of the canvas coordinates of a row: "fraction" of the canvas size. NULL marks rows written before
+# coordinates were normalised (pixels of the resized canvas) that have not been migrated yet.
+COORD_UNIT = "fraction"
+STORED_FIELDS = EVENT_FIELDS + WRITER_FIELDS + ["coord_unit"]
+
+_CREATE_EVENTS = text(
+    "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    + ", ".join(f'"{column}" {_SQL_TYPES[EVENT_SCHEMA[column]]}' for column in EVENT_FIELDS)
+    + ', "writer" TEXT, "seq" INTEGER, "coord_unit" TEXT)'
+)
+# Databases created before writer ids / coordinate units were stored get the columns added
+_ADDED_COLUMNS = {"writer": "TEXT", "seq": "INTEGER", "coord_unit": "TEXT"}
+
+# Canvas coordinate pairs of an event row, by the canvas they were clicked on
+_POINT_COLUMNS = {"shot": ("x_shot", "y_shot"), "location": ("x_location", "y_location")}
+_CREATE_PASSES = text(
+    "CREATE TABLE IF NOT EXISTS passes ("
+    "event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE, "
+    "pass_id INTEGER, from_x REAL, from_y REAL, from_player TEXT, "
+    "to_x REAL, to_y REAL, to_player TEXT)"
+)
+_CREATE_INDEXES = [
+    text('CREATE INDEX IF NOT EXISTS ix_events_match ON events ("match")'),
+    text("CREATE INDEX IF NOT EXISTS ix_passes_event ON passes (event_id)"),
+    text('CREATE INDEX IF NOT EXISTS ix_events_match_writer ON events ("match", "writer", "seq")'),
+]
+
+_INSERT_EVENT = text(
+    "INSERT INTO events (" + ", ".join(f'"{column}"' for column in STORED_FIELDS) + ") "
+    "VALUES (" + ", ".join(f":{column}" for column in STORED_FIELDS) + ")"
+)
+_INSERT_PASS = text(
+    "INSERT INTO passes (event_id, " + ", ".join(PASS_FIELDS) + ") "
+    "VALUES (:event_id, " + ", ".join(f":{field}" for field in PASS_FIELDS) + ")"
+)
+
+
+class EventStore:
+    """Durable SQLite storage for captured events.
+
+    Writes go through a pooled SQLAlchemy engine with the database in WAL mode,
+    and every call to `insert_events` is a single transaction. With `canvas_sizes`
+    ({"shot" | "location" | event type: (width, height)} of the capture canvases),
+    rows still in pixels are converted to fractions of the canvas once, on open.
+    The schema, pragmas and migration are SQLite-specific, so other databases are
+    rejected.
+    """
+
+    def __init__(self, url="sqlite:///water_polo_events.db", pool_size=5, canvas_sizes=None):
+        backend = make_url(url).get_backend_name()
+        if backend != "sqlite":
+            raise ValueError(f"EventStore only supports SQLite databases, got a {backend} URL")
+        self.engine = create_engine(
+            url,
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
+        with self.engine.begin() as conn:
+            conn.execute(_CREATE_EVENTS)
+            existing = {row[1] for row in conn.execute(text("PRAGMA table_info(events)"))}
+            for column, sql_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(text(f'ALTER TABLE events ADD COLUMN "{column}" {sql_type}'))
+            conn.execute(_CREATE_PASSES)
+            for statement in _CREATE_INDEXES:
+                conn.execute(statement)
+            if canvas_sizes:
+                _normalise_pixel_rows(conn, canvas_sizes)
+
+    # Write a batch of event rows (dicts with the Data Entry columns) in one transaction
+    def insert_events(self, rows):
+        with self.engine.begin() as conn:
+            pass_params = []
+            for row in rows:
+                params = {column: row.get(column) for column in STORED_FIELDS}
+                params["coord_unit"] = params["coord_unit"] or COORD_UNIT
+                event_id = conn.execute(_INSERT_EVENT, params).lastrowid
+                for pass_row in row.get("passes") or []:
+                    pass_params.append({"event_id": event_id, **{field: pass_row.get(field) for field in PASS_FIELDS}})
+            if pass_params:
+                conn.execute(_INSERT_PASS, pass_params)
+
+    # Delete one event of a match (undo in a shared match session) - seq numbers restart in every match
+    def delete_event(self, match, writer, seq):
+        with self.engine.begin() as conn:
+            conn.execute(
+                text('DELETE FROM events WHERE "match" = :match AND "writer" = :writer AND "seq" = :seq'),
+                {"match": match, "writer": writer, "seq": seq},
+            )
+
+    # Match id of the most recently stored event, None when the store is empty
+    def latest_match(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text('SELECT "match" FROM events ORDER BY id DESC LIMIT 1')).scalar()
+
+    # Load stored events (optionally for one match) in capture order, with their passes re-attached
+    def load_events(self, match=None):
+        where = ' WHERE "match" = :match' if match is not None else ""
+        params = {"match": match}
+        with self.engine.connect() as conn:
+            events = conn.execute(
+                text("SELECT id, " + ", ".join(f'"{column}"' for column in STORED_FIELDS) + " FROM events" + where + " ORDER BY id"),
+                params,
+            ).mappings().all()
+            passes = conn.execute(
+                text(
+                    "SELECT p.event_id, " + ", ".join(f"p.{field}" for field in PASS_FIELDS)
+                    + " FROM passes p JOIN events e ON e.id = p.event_id" + where.replace('"match"', 'e."match"')
+                    + " ORDER BY p.event_id, p.pass_id"
+                ),
+                params,
+            ).mappings().all()
+
+        passes_by_event = {}
+        for pass_row in passes:
+            passes_by_event.setdefault(pass_row["event_id"], []).append({field: pass_row[field] for field in PASS_FIELDS})
+
+        rows = []
+        for event_row in events:
+            row = {column: event_row[column] for column in STORED_FIELDS}
+            row["passes"] = passes_by_event.get(event_row["id"], [])
+            rows.append(row)
+        return rows
+
+
+# One-off migration of rows without a coordinate unit. Rows written between the switch to fractions and the
+# unit column have no unit either, so each coordinate pair is only divided when it is outside [0, 1] - a
+# fraction never is, and a pixel click inside the first pixel of the canvas is the only ambiguous case.
+def _normalise_pixel_rows(conn, canvas_sizes):
+    unmarked = '"coord_unit" IS NULL'
+    for canvas, (x, y) in _POINT_COLUMNS.items():
+        if canvas in canvas_sizes:
+            width, height = canvas_sizes[canvas]
+            conn.execute(
+                text(f'UPDATE events SET "{x}" = "{x}" / :width, "{y}" = "{y}" / :height '
+                     f'WHERE {unmarked} AND ("{x}" > 1 OR "{y}" > 1)'),
+                {"width": width, "height": height},
+            )
+    for event_type, (width, height) in canvas_sizes.items():
+        if event_type in _POINT_COLUMNS:
+            continue
+        conn.execute(
+            text('UPDATE passes SET from_x = from_x / :width, from_y = from_y / :height, '
+                 'to_x = to_x / :width, to_y = to_y / :height '
+                 f'WHERE (from_x > 1 OR from_y > 1 OR to_x > 1 OR to_y > 1) AND event_id IN '
+                 f'(SELECT id FROM events WHERE {unmarked} AND "event" = :event)'),
+            {"width": width, "height": height, "event": event_type},
+        )
+    conn.execute(text(f'UPDATE events SET "coord_unit" = :unit WHERE {unmarked}'), {"unit": COORD_UNIT})
+
+
+# WAL lets the stats page read while entry writes; NORMAL sync is durable enough under WAL
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
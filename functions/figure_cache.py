@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+import streamlit as st
+
+
+class FigureCache:
+    """Size-bounded LRU cache of Plotly figures, stored as serialized figure JSON.
+
+    Keys should identify the data version and the selection, e.g.
+    (dataset hash, period, chart name). Every hit returns a fresh figure object,
+    so callers can still modify what they get back.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            figure_json = self._figures.get(key)
+            if figure_json is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+        if figure_json is not None:
+            return pio.from_json(figure_json)
+
+        figure = build()
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = figure.to_json()
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+# One figure cache per process, shared by every page and session
+@st.cache_resource
+def shared_figure_cache():
+    return FigureCache(maxsize=512)
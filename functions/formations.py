@@ -0,0 +1,84 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Player/post positions of the pass map templates, per event type.
+# Coordinates are fractions of the pass map canvas (x from the left, y from the top, both in [0, 1]),
+# so they hold for any image or screen size.
+FORMATIONS = {
+    "6v5": {
+        'player1': (0.85, 0.2778),
+        'player2': (0.6, 0.7407),
+        'player4': (0.375, 0.7292),
+        'player5': (0.1625, 0.2778),
+        'Second Post': (0.375, 0.2778),
+        'First Post': (0.6, 0.2778),
+    },
+    "6v6": {
+        'player1': (0.8125, 0.2592),
+        'player2': (0.6875, 0.6695),
+        'player3': (0.5, 0.8099),
+        'player4': (0.3125, 0.6695),
+        'player5': (0.1875, 0.2592),
+        'pit': (0.5, 0.2592),
+    },
+}
+
+# Width / height of the pass map images as shown on the canvas, for drawing templates to scale
+ASPECT_RATIOS = {
+    "6v5": 800 / 432,
+    "6v6": 800 / 463,
+}
+
+
+class FormationTemplate:
+    """Player positions of a template as a NumPy array, for nearest-player lookups.
+
+    `assign` resolves any number of points in one vectorised distance computation;
+    templates with many positions use a KD-tree instead of the full distance matrix.
+    Distances are measured with x scaled by the canvas aspect ratio, i.e. as on screen.
+    """
+
+    def __init__(self, positions, aspect=1.0, kdtree_size=32):
+        self.names = np.array(list(positions), dtype=object)
+        self.scale = np.array([aspect, 1.0])
+        self.points = np.array(list(positions.values()), dtype=float).reshape(-1, 2) * self.scale
+        self._tree = cKDTree(self.points) if len(self.points) >= kdtree_size else None
+
+    # Name of the closest position to every normalised (x, y) point
+    def assign(self, x, y):
+        points = np.column_stack([np.asarray(x, dtype=float).ravel(), np.asarray(y, dtype=float).ravel()]) * self.scale
+        if self._tree is not None:
+            _, nearest = self._tree.query(points)
+        else:
+            nearest = ((points[:, None, :] - self.points[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        return self.names[nearest]
+
+
+# One template object per event type, built once per process
+TEMPLATES = {event: FormationTemplate(positions, ASPECT_RATIOS[event]) for event, positions in FORMATIONS.items()}
+
+
+# Pass dicts for every line drawn on a width x height pass map canvas, in normalised coordinates,
+# both endpoints of all lines resolved at once. `indices` are the objects' positions on the canvas (pass ids).
+def canvas_passes(objects, template, width, height, indices=None):
+    indices = range(len(objects)) if indices is None else indices
+    lines = [(i, obj) for i, obj in zip(indices, objects) if obj.get("type") == "line"]
+    if not lines:
+        return []
+
+    # Absolute coordinates: bounding box position + relative endpoints, as fractions of the canvas
+    coords = np.array([
+        [obj["left"] + obj["x1"], obj["top"] + obj["y1"], obj["left"] + obj["x2"], obj["top"] + obj["y2"]]
+        for _, obj in lines
+    ], dtype=float) / [width, height, width, height]
+    players = template.assign(np.concatenate([coords[:, 0], coords[:, 2]]), np.concatenate([coords[:, 1], coords[:, 3]]))
+    from_players, to_players = players[:len(lines)], players[len(lines):]
+
+    return [
+        {
+            "pass_id": i,
+            "from_x": x1, "from_y": y1, "from_player": from_player,
+            "to_x": x2, "to_y": y2, "to_player": to_player,
+        }
+        for (i, _), (x1, y1, x2, y2), from_player, to_player in zip(lines, coords.tolist(), from_players, to_players)
+    ]
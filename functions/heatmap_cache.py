@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class HeatmapCache:
+    """LRU cache of heatmap density grids keyed by (team, filter, match, engine).
+
+    A value is the Z grid, or None when there are not enough shots to draw one.
+    The cache can be written to / warmed from a compressed .npz file; entries are
+    only reused when the file was saved for the same dataset version.
+    """
+
+    def __init__(self, maxsize=256, version=None):
+        self.maxsize = maxsize
+        self.version = version
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._grids)
+
+    def __contains__(self, key):
+        return key in self._grids
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._grids:
+                return default
+            self._grids.move_to_end(key)
+            return self._grids[key]
+
+    def put(self, key, grid):
+        with self._lock:
+            self._grids[key] = grid
+            self._grids.move_to_end(key)
+            while len(self._grids) > self.maxsize:
+                self._grids.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._grids:
+                self._grids.move_to_end(key)
+                return self._grids[key]
+        grid = compute()
+        self.put(key, grid)
+        return grid
+
+    # Precompute every key not cached yet
+    def warm(self, keys, compute):
+        for key in keys:
+            if key not in self:
+                self.put(key, compute(*key))
+
+    def save(self, path):
+        with self._lock:
+            items = list(self._grids.items())
+        keys = [list(key) for key, _ in items]
+        arrays = {f"z_{i}": grid for i, (_, grid) in enumerate(items) if grid is not None}
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, keys=np.array(json.dumps(keys)), version=np.array(str(self.version)), **arrays)
+        os.replace(tmp_path, path)
+
+    # Load grids saved for this cache's dataset version; returns the number of entries loaded
+    def load(self, path):
+        if not os.path.exists(path):
+            return 0
+        with np.load(path) as data:
+            if str(data["version"]) != str(self.version):
+                return 0
+            keys = json.loads(str(data["keys"]))
+            for i, key in enumerate(keys):
+                name = f"z_{i}"
+                self.put(tuple(key), data[name] if name in data.files else None)
+        return len(keys)
@@ -0,0 +1,107 @@
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import streamlit as st
+
+from functions.schema import EVENT_SCHEMA, CATEGORIES
+
+
+# Hash of the raw uploaded bytes - key for the parsed-file cache
+def file_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+# "mm:ss" (or plain seconds) -> seconds as float, NaN when missing/unparseable.
+# A match only has a few hundred distinct clock values, so only the unique values are parsed.
+def time_to_seconds(time):
+    codes, uniques = pd.factorize(pd.Series(time).astype("string"))
+    parts = pd.Series(uniques, dtype="string").str.split(":", n=1, expand=True).reindex(columns=[0, 1])
+    first = pd.to_numeric(parts[0], errors="coerce")
+    second = pd.to_numeric(parts[1], errors="coerce")
+    parsed = (first * 60 + second).where(second.notna(), first).to_numpy(dtype="float64")
+    return pd.Series(np.where(codes >= 0, parsed[codes], np.nan), index=pd.Series(time).index)
+
+
+# Read an exported match CSV with a declared schema instead of dtype inference.
+# Text columns are read as Arrow strings up front: left to inference, a zero-padded clock
+# such as "07:45" would be parsed as a time of day.
+def read_events_csv(source):
+    dtypes = {column: dtype for column, dtype in EVENT_SCHEMA.items() if dtype != "object"}
+    dtypes.update({column: "category" for column in CATEGORIES})
+    dtypes["outcome"] = dtypes["result"] = "category"
+    text_columns = [column for column, dtype in EVENT_SCHEMA.items() if dtype in ("string", "object")] + ["outcome"]
+    # "None" is a real value (no shot type, no subevent...) - only empty cells are missing
+    table = pv.read_csv(source, convert_options=pv.ConvertOptions(
+        column_types={column: pa.string() for column in text_columns},
+        null_values=[""],
+        strings_can_be_null=True,
+    ))
+    df = table.to_pandas()
+    return normalise_events(df.astype({column: dtype for column, dtype in dtypes.items() if column in df}))
+
+
+# Shared post-processing for every upload format: outcome column, ordered categories, time in seconds
+def normalise_events(df):
+    if "outcome" not in df and "result" in df:
+        df = df.rename(columns={"result": "outcome"})
+
+    for column, declared in CATEGORIES.items():
+        if column in df:
+            values = df[column] if isinstance(df[column].dtype, pd.CategoricalDtype) else df[column].astype("category")
+            extra = sorted(set(values.cat.categories) - set(declared))
+            df[column] = values.cat.set_categories(declared + extra)
+
+    if "time" in df:
+        df["time"] = df["time"].astype("string")
+        df["time_seconds"] = time_to_seconds(df["time"])
+    return df
+
+
+# Read a Parquet/Feather export. `source` may be a path (memory-mapped) or an Arrow buffer;
+# passes come back as native lists of pass dicts, not a repr string.
+def read_events_arrow(source, kind):
+    if kind == "parquet":
+        table = pq.read_table(source, memory_map=isinstance(source, str))
+    else:
+        table = feather.read_table(source, memory_map=isinstance(source, str))
+    return normalise_events(table.to_pandas())
+
+
+# Upload/archive format from the file name
+def file_kind(file_name):
+    return file_name.rsplit(".", 1)[-1].lower()
+
+
+def read_events(source, kind):
+    if kind == "csv":
+        return read_events_csv(source)
+    return read_events_arrow(source, kind)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_events(data_hash, kind, _data):
+    source = io.BytesIO(_data) if kind == "csv" else pa.BufferReader(_data)
+    return read_events(source, kind)
+
+
+# Columnar exports - a DataFrame or an Arrow table (e.g. EventLog.to_arrow(), which keeps passes as list<struct>)
+def _as_table(data):
+    return data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+
+
+def to_parquet_bytes(data):
+    sink = pa.BufferOutputStream()
+    pq.write_table(_as_table(data), sink)
+    return sink.getvalue().to_pybytes()
+
+
+def to_feather_bytes(data):
+    sink = pa.BufferOutputStream()
+    feather.write_feather(_as_table(data), sink)
+    return sink.getvalue().to_pybytes()
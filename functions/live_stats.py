@@ -0,0 +1,76 @@
+from collections import Counter
+
+import pandas as pd
+
+from functions.match_cube import CUBE_LEVELS
+
+
+# Missing values (None, NaN, pd.NA) all map to None so keys from rows and frames agree
+def _clean(value):
+    return None if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)) else value
+
+
+class LiveStats:
+    """Running event counters keyed like the match cube.
+
+    `add` / `remove` update the counters in O(1) per event, so the live scoreboard
+    and the stats sections never rescan the whole match.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.scores = Counter()
+        self.version = 0  # bumped on every change - cache key for derived tables and figures
+
+    # Cube key of an event row. Data Entry rows store the outcome under "result".
+    @staticmethod
+    def key(row):
+        values = dict(row)
+        if values.get("outcome") is None:
+            values["outcome"] = values.get("result")
+        return tuple(_clean(values.get(level)) for level in CUBE_LEVELS)
+
+    def add(self, row):
+        key = self.key(row)
+        self.counts[key] += 1
+        if key[CUBE_LEVELS.index("outcome")] == "Goal":
+            self.scores[key[0]] += 1
+        self.version += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    # Roll back an event previously passed to `add` (deleted from the log)
+    def remove(self, row):
+        key = self.key(row)
+        if self.counts[key] <= 0:
+            raise KeyError(f"Event not counted: {key}")
+        self.counts[key] -= 1
+        if not self.counts[key]:
+            del self.counts[key]
+        if key[CUBE_LEVELS.index("outcome")] == "Goal":
+            self.scores[key[0]] -= 1
+        self.version += 1
+
+    def score(self, team):
+        return self.scores[team]
+
+    # Counters as a cube Series, same shape as functions.match_cube.build_cube
+    def to_cube(self):
+        if not self.counts:
+            return pd.Series([], dtype="int64", name="count",
+                             index=pd.MultiIndex.from_tuples([], names=CUBE_LEVELS))
+        index = pd.MultiIndex.from_tuples(list(self.counts), names=CUBE_LEVELS)
+        return pd.Series(list(self.counts.values()), index=index, name="count").sort_index()
+
+    # Seed the counters from an already built cube (e.g. an uploaded match)
+    @classmethod
+    def from_cube(cls, cube):
+        stats = cls()
+        for key, count in cube.items():
+            stats.counts[tuple(_clean(value) for value in key)] += int(count)
+        for key, count in stats.counts.items():
+            if key[CUBE_LEVELS.index("outcome")] == "Goal":
+                stats.scores[key[0]] += count
+        return stats
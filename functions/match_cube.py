@@ -0,0 +1,110 @@
+import pandas as pd
+import streamlit as st
+
+# Dimensions of the per-match count cube. player_affected is only used by the Saves section.
+CUBE_LEVELS = ["team", "period", "event", "subevent", "outcome", "shot_type", "player_affected"]
+SHOT_TYPES = ["Skip Shot", "Lob Shot", "Normal Shot"]
+
+
+# One groupby pass: number of events for every team x period x event x subevent x outcome x shot_type
+# Categorical columns are grouped on their integer codes; the (small) result index holds plain values
+def build_cube(df):
+    cube = df.reindex(columns=CUBE_LEVELS).groupby(CUBE_LEVELS, dropna=False, observed=True).size().rename("count")
+    cube.index = pd.MultiIndex.from_arrays(
+        [cube.index.get_level_values(level).astype(object) for level in CUBE_LEVELS], names=CUBE_LEVELS
+    )
+    return cube
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def match_cube(data_hash, _df):
+    return build_cube(_df)
+
+
+# Cube for one period (period level dropped), memoised so switching period is a lookup
+@st.cache_data(show_spinner=False, max_entries=256)
+def period_cube(data_hash, period, _df):
+    return slice_period(match_cube(data_hash, _df), period)
+
+
+def slice_period(cube, period):
+    if period == "All":
+        return counts(cube, [level for level in CUBE_LEVELS if level != "period"], as_frame=False)
+    return cube[cube.index.get_level_values("period") == period].droplevel("period")
+
+
+# Sum the cube over every level not in `levels`
+def counts(cube, levels, as_frame=True):
+    summed = cube.groupby(level=levels, dropna=False).sum()
+    return summed.reset_index(name="count") if as_frame else summed
+
+
+def _outcome_mask(cube, outcomes):
+    return cube.index.get_level_values("outcome").isin(outcomes)
+
+
+# Goals, exclusions drawn, attempts and success rate per team and `by` (event or subevent)
+def success_table(cube, by):
+    by_outcome = cube.groupby(level=["team", by, "outcome"], dropna=False).sum().unstack("outcome", fill_value=0)
+    table = pd.DataFrame({
+        "goals_scored": by_outcome.get("Goal", 0),
+        "exclusions_drawn": by_outcome.get("Exclusion", 0),
+        "attempts_made": by_outcome.sum(axis=1),
+    })
+
+    # Share of 6v5 possessions ending in a goal, per team - values an exclusion drawn
+    six_v_five = cube[cube.index.get_level_values("event") == "6v5"]
+    six_v_five_totals = six_v_five.groupby(level="team", dropna=False).sum()
+    six_v_five_goals = six_v_five[_outcome_mask(six_v_five, ["Goal"])].groupby(level="team", dropna=False).sum()
+    proportion = (six_v_five_goals / six_v_five_totals).fillna(0)
+
+    table["proportion"] = table.index.get_level_values("team").map(proportion).fillna(0)
+    table["success_rate"] = ((table["goals_scored"] + table["exclusions_drawn"] * table["proportion"]) / table["attempts_made"]) * 100
+    return table.reset_index()
+
+
+# Saves against shots on target per team, event, subevent and player
+def saves_table(cube):
+    levels = ["team", "event", "subevent", "player_affected"]
+    saves = counts(cube[_outcome_mask(cube, ["Save"])], levels)
+    saves["team_player"] = saves["team"] + " - " + saves["player_affected"]
+    shots = counts(cube[_outcome_mask(cube, ["Save", "Miss", "Goal"])], levels)
+    table = saves.merge(shots, on=levels, how="outer", suffixes=("_saves", "_shots"))
+    table["save_success_rate"] = (table["count_saves"] / table["count_shots"]) * 100
+    return table
+
+
+# Count of shots per team and shot type, optionally only those with the given outcome
+def shot_type_table(cube, outcome=None):
+    shots = cube[cube.index.get_level_values("shot_type").isin(SHOT_TYPES)]
+    if outcome is not None:
+        shots = shots[_outcome_mask(shots, [outcome])]
+    return counts(shots, ["team", "shot_type"])
+
+
+# Blocks, turnovers and exclusions per team, event and subevent
+def bte_table(cube):
+    return counts(cube[_outcome_mask(cube, ["Block", "Turnover", "Exclusion"])], ["team", "event", "subevent"])
+
+
+# Every table shown by the Match Stats sections, built from one period cube
+TABLE_BUILDERS = {
+    "event_counts": lambda cube: counts(cube, ["event", "team"]),
+    "event_success": lambda cube: success_table(cube, "event"),
+    "subevent_counts": lambda cube: counts(cube, ["subevent", "team"]),
+    "subevent_success": lambda cube: success_table(cube, "subevent"),
+    "saves": saves_table,
+    "shot_types": shot_type_table,
+    "shot_goals": lambda cube: shot_type_table(cube, outcome="Goal"),
+    "bte": bte_table,
+}
+
+
+# The tables in `names` (all of them by default) - a section only builds what it shows
+def section_tables(cube, names=None):
+    return {name: TABLE_BUILDERS[name](cube) for name in (names or TABLE_BUILDERS)}
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def period_tables(data_version, period, _cube, names=None):
+    return section_tables(_cube, names)
@@ -0,0 +1,240 @@
+import bisect
+import itertools
+import math
+import threading
+import time
+import uuid
+
+import pyarrow as pa
+import streamlit as st
+
+from functions.event_log import EventLog
+from functions.live_stats import LiveStats
+from functions.momentum import MomentumTracker, event_seconds
+from functions.schema import ARROW_SCHEMA
+from functions.score_model import ScorePredictor, load_model
+
+
+# Merge position of an event: match time first, capture order between events at the same time.
+# Events without a readable period/time go after the timed ones, in arrival order.
+def merge_key(row, arrival):
+    seconds = event_seconds(row.get("period"), row.get("time"))
+    return (math.inf if math.isnan(seconds) else seconds, arrival)
+
+
+class MatchSession:
+    """Live events of one match, shared by every entry tab writing it.
+
+    Each writer (one Data Entry tab) numbers its own events; a row is identified
+    by (writer, seq), so writers never need to coordinate and one can undo its
+    last event while others keep capturing. Rows are kept merged in match-time
+    order (period, then clock, then arrival). The live stats counters, momentum
+    tracker and score predictor are updated per event under the same lock, and
+    `version` is bumped on every change. Versions restart in a new session of the
+    same match, so readers cache on (`token`, `version`).
+    """
+
+    def __init__(self, match, model=None, writer_seq=None):
+        self.match = match
+        self.token = uuid.uuid4().hex  # unique per session object, never reused
+        self.live_stats = LiveStats()
+        self.momentum = MomentumTracker()
+        self.score_predictor = ScorePredictor(model or load_model())
+        self.version = 0
+        self.updated = time.monotonic()
+
+        self._keys = []  # merge keys, sorted
+        self._rows = []  # rows in the same order as self._keys
+        self._writer_seq = dict(writer_seq or {})  # writer -> last sequence number handed out
+        self._arrival = itertools.count()
+        self._lock = threading.RLock()
+        self._log = EventLog()  # merged rows as a typed log; None when it must be rebuilt
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _insert(self, row):
+        key = merge_key(row, next(self._arrival))
+        i = bisect.bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._rows.insert(i, row)
+        # The usual live case is a new last event: extend the log. An earlier match time means a rebuild
+        if self._log is not None:
+            if i == len(self._rows) - 1:
+                self._log.append(row)
+            else:
+                self._log = None
+        self.live_stats.add(row)
+        self.momentum.add(row)
+        self.score_predictor.add(row)
+
+    def _changed_now(self):
+        self.version += 1
+        self.updated = time.monotonic()
+
+    # Add an event captured by `writer`; returns the stored row (with its writer and seq)
+    def add(self, writer, row):
+        with self._lock:
+            seq = self._writer_seq.get(writer, 0) + 1
+            self._writer_seq[writer] = seq
+            row = dict(row, writer=writer, seq=seq)
+            self._insert(row)
+            self._changed_now()
+            return row
+
+    # Seed with rows that already carry their writer and seq (e.g. reloaded from the event database)
+    def extend(self, rows):
+        with self._lock:
+            for row in rows:
+                writer, seq = row.get("writer"), row.get("seq")
+                if writer is not None and seq is not None:
+                    self._writer_seq[writer] = max(self._writer_seq.get(writer, 0), int(seq))
+                self._insert(dict(row))
+            self._changed_now()
+
+    # Last sequence number handed out to every writer
+    def writer_seqs(self):
+        with self._lock:
+            return dict(self._writer_seq)
+
+    # Most recent event of a writer still in the session (highest seq), or None
+    def last_event(self, writer):
+        with self._lock:
+            return max((row for row in self._rows if row.get("writer") == writer),
+                       key=lambda row: row["seq"], default=None)
+
+    # Remove one event (undo); returns the removed row or None if it is not in the session
+    def remove(self, writer, seq):
+        with self._lock:
+            for i in range(len(self._rows) - 1, -1, -1):
+                row = self._rows[i]
+                if row.get("writer") == writer and row.get("seq") == seq:
+                    del self._rows[i]
+                    del self._keys[i]
+                    self._log = None
+                    self.live_stats.remove(row)
+                    self.momentum.remove(row)
+                    self.score_predictor.remove(row)
+                    self._changed_now()
+                    return row
+            return None
+
+    # Undo a writer's most recent event
+    def undo(self, writer):
+        with self._lock:
+            row = self.last_event(writer)
+            return None if row is None else self.remove(writer, row["seq"])
+
+    # Snapshots of the live trackers, taken under the session lock - readers on other threads
+    # (e.g. the Match Stats fragments) go through these, never through the trackers directly
+    def score(self, team):
+        with self._lock:
+            return self.live_stats.score(team)
+
+    def cube(self):
+        with self._lock:
+            return self.live_stats.to_cube()
+
+    def predictions(self):
+        with self._lock:
+            return self.score_predictor.predictions()
+
+    def momentum_frame(self):
+        with self._lock:
+            return self.momentum.to_frame()
+
+    # Merged rows, oldest match time first
+    def rows(self):
+        with self._lock:
+            return list(self._rows)
+
+    def _merged_log(self):
+        if self._log is None:
+            self._log = EventLog()
+            self._log.extend(self._rows)
+        return self._log
+
+    # Typed snapshot in merge order - built at most once per version, shared by every reader
+    def to_frame(self):
+        with self._lock:
+            return self._merged_log().to_frame()
+
+    def to_arrow(self):
+        return pa.Table.from_pandas(self.to_frame(), schema=ARROW_SCHEMA, preserve_index=False)
+
+
+class MatchRegistry:
+    """Process-wide map of match id -> MatchSession.
+
+    Sessions are only a live view of the event database, so they can be dropped at any
+    time: every lookup evicts the other sessions that are empty (e.g. a match id typed
+    and abandoned) or have not been used for `max_idle` seconds. The next lookup of an
+    evicted match reseeds it from the stored and still-queued rows. The writers' sequence
+    numbers carry over, so an undone (and possibly still to be deleted) seq is never
+    handed out again.
+    """
+
+    def __init__(self, max_idle=4 * 3600):
+        self.max_idle = max_idle
+        self._sessions = {}
+        self._used = {}  # match -> time of the last lookup
+        self._retired_seq = {}  # match -> writer sequence numbers of its evicted session
+        self._lock = threading.Lock()
+
+    # Session of a match, created on first use and seeded with `loader(match)` (stored rows).
+    # The loader reads the database, so it runs outside the registry lock; if another tab
+    # created the session meanwhile, that one wins and the copy built here is dropped.
+    def session(self, match, loader=None):
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now, keep=match)
+            session = self._sessions.get(match)
+            if session is not None:
+                self._used[match] = now
+                return session
+            writer_seq = self._retired_seq.get(match)
+
+        session = MatchSession(match, writer_seq=writer_seq)
+        if loader is not None:
+            session.extend(loader(match))
+
+        with self._lock:
+            session = self._sessions.setdefault(match, session)
+            self._retired_seq.pop(match, None)
+            self._used[match] = time.monotonic()
+            return session
+
+    def _evict(self, now, keep):
+        for match, session in list(self._sessions.items()):
+            idle = now - max(self._used.get(match, 0.0), session.updated)
+            if match != keep and (not len(session) or idle > self.max_idle):
+                del self._sessions[match]
+                self._used.pop(match, None)
+                self._retired_seq[match] = session.writer_seqs()
+
+    def get(self, match):
+        with self._lock:
+            return self._sessions.get(match)
+
+    # Match ids with a live session, most recently changed first
+    def matches(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [session.match for session in sorted(sessions, key=lambda s: s.updated, reverse=True) if len(session)]
+
+
+# One registry per process: every entry tab and stats page sees the same live matches
+@st.cache_resource
+def shared_registry():
+    return MatchRegistry()
+
+
+# Live session shown by the analysis views: the one this browser session writes to, else the most recently updated live match
+def live_session():
+    registry = shared_registry()
+    if "match_session" in st.session_state:
+        session = registry.get(st.session_state.match_session.match)
+        if session is not None:
+            return session
+    matches = registry.matches()
+    return registry.get(matches[0]) if matches else None
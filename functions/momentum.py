@@ -0,0 +1,198 @@
+import math
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from functions.ingest import time_to_seconds
+from functions.schema import PERIODS, TEAMS
+
+# Length of a period on the match clock (water polo: 4 x 8 minutes)
+PERIOD_SECONDS = 8 * 60
+
+# Seconds for an event's contribution to decay by half
+HALF_LIFE = 120.0
+
+# Possession outcome -> momentum contribution for the team in possession
+OUTCOME_WEIGHTS = {
+    "Goal": 1.0,
+    "Exclusion": 0.5,
+    "Save": -0.25,
+    "Block": -0.25,
+    "Miss": -0.25,
+    "Turnover": -0.5,
+}
+
+
+# Match time in seconds from the period and the clock entered for the event (time elapsed in the period).
+# Pass countdown=True when the clock was read as time remaining.
+def absolute_seconds(period, time_seconds, period_length=PERIOD_SECONDS, countdown=False):
+    period_index = pd.Series(pd.Categorical(np.asarray(period, dtype=object), categories=PERIODS).codes, dtype="int64")
+    clock = pd.Series(np.asarray(time_seconds, dtype="float64"))
+    elapsed = period_length - clock if countdown else clock
+    return (period_index * period_length + elapsed).where(period_index >= 0).to_numpy()
+
+
+# Scalar version of `absolute_seconds` for a single event row, NaN when the period or clock is missing
+def event_seconds(period, time, period_length=PERIOD_SECONDS, countdown=False):
+    if period not in PERIODS:
+        return math.nan
+    minutes, _, seconds = str(time).partition(":")
+    try:
+        clock = float(minutes) * 60 + float(seconds) if seconds else float(minutes)
+    except ValueError:
+        return math.nan
+    return PERIODS.index(period) * period_length + (period_length - clock if countdown else clock)
+
+
+class MomentumTracker:
+    """Exponentially weighted momentum per team, updated in O(1) per event.
+
+    Each team keeps its score at the time of its latest event; older events decay
+    by exp(-dt / tau). Events arriving out of order are folded in with the decay
+    they would have had by then, so the result does not depend on entry order.
+    `points` is the chart series: both teams' momentum after every event.
+    """
+
+    def __init__(self, half_life=HALF_LIFE, period_length=PERIOD_SECONDS, countdown=False):
+        self.tau = half_life / math.log(2)
+        self.period_length = period_length
+        self.countdown = countdown
+        self.values = {team: 0.0 for team in TEAMS}
+        self.last_time = 0.0
+        self.events = []  # (seconds, team, weight) in arrival order
+        self.points = []  # (seconds, {team: momentum})
+        self.version = 0
+
+    def _event(self, row):
+        values = dict(row)
+        outcome = values.get("outcome") or values.get("result")
+        seconds = event_seconds(values.get("period"), values.get("time"), self.period_length, self.countdown)
+        return seconds, values.get("team"), OUTCOME_WEIGHTS.get(outcome, 0.0)
+
+    # Decay every team forward to `seconds` (never backwards)
+    def _advance(self, seconds):
+        if seconds > self.last_time:
+            decay = math.exp(-(seconds - self.last_time) / self.tau)
+            for team in self.values:
+                self.values[team] *= decay
+            self.last_time = seconds
+
+    def _fold(self, seconds, team, weight):
+        self._advance(seconds)
+        if team in self.values:
+            self.values[team] += weight * math.exp(-(self.last_time - seconds) / self.tau)
+
+    def add(self, row):
+        seconds, team, weight = self._event(row)
+        self.events.append((seconds, team, weight))
+        if not np.isnan(seconds):
+            self._fold(seconds, team, weight)
+            self.points.append((self.last_time, dict(self.values)))
+        self.version += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    # Roll back an event previously passed to `add`. Undoing the latest event is O(1);
+    # removing an older one rebuilds the chart series from the remaining events.
+    def remove(self, row):
+        event = self._event(row)
+        position = next((i for i in range(len(self.events) - 1, -1, -1)
+                         if _same_event(self.events[i], event)), None)
+        if position is None:
+            raise KeyError(f"Event not tracked: {event}")
+        seconds, team, weight = self.events.pop(position)
+        if position == len(self.events):
+            if not np.isnan(seconds):
+                self.points.pop()
+                self.last_time = self.points[-1][0] if self.points else 0.0
+                self.values = dict(self.points[-1][1]) if self.points else {t: 0.0 for t in TEAMS}
+        else:
+            self._rebuild()
+        self.version += 1
+
+    def _rebuild(self):
+        events = self.events
+        self.values = {team: 0.0 for team in TEAMS}
+        self.last_time = 0.0
+        self.events = []
+        self.points = []
+        for seconds, team, weight in events:
+            self.events.append((seconds, team, weight))
+            if not np.isnan(seconds):
+                self._fold(seconds, team, weight)
+                self.points.append((self.last_time, dict(self.values)))
+
+    # Momentum of a team at `seconds` (default: its latest event)
+    def value(self, team, seconds=None):
+        if seconds is None or seconds <= self.last_time:
+            return self.values.get(team, 0.0)
+        return self.values.get(team, 0.0) * math.exp(-(seconds - self.last_time) / self.tau)
+
+    # Chart series in the same layout as `momentum_series`
+    def to_frame(self):
+        return pd.DataFrame(
+            [{"seconds": seconds, **values} for seconds, values in self.points],
+            columns=["seconds"] + TEAMS,
+        ).assign(net=lambda frame: frame[TEAMS[0]] - frame[TEAMS[1]])
+
+
+def _same_event(a, b):
+    return (a[1] == b[1] and a[2] == b[2]
+            and (a[0] == b[0] or (np.isnan(a[0]) and np.isnan(b[0]))))
+
+
+# Batch version for whole matches or archives: momentum of both teams after every event.
+# Within a match, s(t_i) = exp(-t_i / tau) * cumsum(w_j * exp(t_j / tau)), evaluated per team
+# with one cumulative sum - times are taken relative to each match's first event.
+def momentum_series(df, half_life=HALF_LIFE, period_length=PERIOD_SECONDS, countdown=False, by="match"):
+    tau = half_life / math.log(2)
+    outcome = df["outcome"] if "outcome" in df else df["result"]
+    time_seconds = df["time_seconds"] if "time_seconds" in df else time_to_seconds(df["time"])
+
+    events = pd.DataFrame({
+        "match": df[by].astype(str).to_numpy() if by in df else "",
+        "seconds": absolute_seconds(df["period"], time_seconds, period_length, countdown),
+        "team": df["team"].astype(str).to_numpy(),
+        "weight": pd.Series(np.asarray(outcome, dtype=object)).map(OUTCOME_WEIGHTS).fillna(0.0).to_numpy(),
+    }).dropna(subset=["seconds"])
+    events = events.sort_values(["match", "seconds"], kind="stable").reset_index(drop=True)
+
+    relative = (events["seconds"] - events.groupby("match")["seconds"].transform("min")).to_numpy()
+    growth = np.exp(relative / tau)
+    for team in TEAMS:
+        contribution = pd.Series(np.where(events["team"] == team, events["weight"] * growth, 0.0))
+        events[team] = contribution.groupby(events["match"]).cumsum().to_numpy() / growth
+    events["net"] = events[TEAMS[0]] - events[TEAMS[1]]
+    return events[["match", "seconds"] + TEAMS + ["net"]]
+
+
+# Momentum series of an uploaded dataset, computed once per file
+@st.cache_data(show_spinner=False, max_entries=16)
+def match_momentum(data_hash, _df):
+    return momentum_series(_df)
+
+
+# Line chart of both teams' momentum over match time, with period boundaries marked
+def momentum_figure(series, period_length=PERIOD_SECONDS):
+    fig = go.Figure()
+    for team in TEAMS:
+        fig.add_trace(go.Scatter(
+            x=series["seconds"] / 60,
+            y=series[team],
+            mode="lines+markers",
+            line_shape="hv",
+            name=team,
+        ))
+    for boundary in range(1, len(PERIODS)):
+        fig.add_vline(x=boundary * period_length / 60, line_dash="dot", line_color="grey")
+    fig.update_layout(
+        title="Momentum by Team",
+        xaxis_title="Match time (min)",
+        yaxis_title="Momentum",
+        height=500,
+    )
+    return fig
@@ -0,0 +1,179 @@
+import ast
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import scipy.sparse as sp
+import streamlit as st
+
+from functions.formations import ASPECT_RATIOS, FORMATIONS, TEMPLATES
+
+# Event types with a pass map template
+NETWORK_EVENTS = list(FORMATIONS)
+
+
+# The passes cell of an event, whatever the source format: a list of pass dicts (Data Entry,
+# Parquet/Feather), a numpy array of dicts (Arrow -> pandas) or its repr string (CSV export)
+def parse_passes(value):
+    if isinstance(value, str):
+        value = ast.literal_eval(value) if value.strip() else []
+    if value is None or (np.isscalar(value) and pd.isna(value)):
+        return []
+    return list(value)
+
+
+# Node order of a template - matrix row/column i is players(event)[i]
+def players(event):
+    return list(FORMATIONS[event])
+
+
+# One row per pass: match, team, event, from/to node index. Passes from or to a name
+# outside the template are dropped.
+def pass_edges(df):
+    events = df[df["event"].astype(str).isin(NETWORK_EVENTS)]
+    edges = pd.DataFrame({
+        "match": events["match"].astype(str).to_numpy() if "match" in events else "",
+        "team": events["team"].astype(str).to_numpy(),
+        "event": events["event"].astype(str).to_numpy(),
+        "passes": events["passes"].map(parse_passes).to_numpy(),
+    }).explode("passes", ignore_index=True).dropna(subset=["passes"])
+
+    passes = pd.DataFrame(edges.pop("passes").tolist(), index=edges.index,
+                          columns=["from_player", "to_player"])
+    edges["from"] = -1
+    edges["to"] = -1
+    for event in NETWORK_EVENTS:
+        rows = edges["event"] == event
+        codes = {player: i for i, player in enumerate(players(event))}
+        edges.loc[rows, "from"] = passes.loc[rows, "from_player"].map(codes)
+        edges.loc[rows, "to"] = passes.loc[rows, "to_player"].map(codes)
+    edges = edges.dropna(subset=["from", "to"])
+    return edges[(edges["from"] >= 0) & (edges["to"] >= 0)].astype({"from": "int64", "to": "int64"})
+
+
+# Passes column with every from/to player re-resolved from the stored coordinates, e.g. after a
+# template was recalibrated. All endpoints of an event type are assigned in one vectorised lookup.
+def retag_passes(df, templates=TEMPLATES):
+    passes = df["passes"].map(parse_passes)
+    flat = passes.explode().dropna()
+    if flat.empty:
+        return passes
+    records = pd.DataFrame(flat.tolist(), index=flat.index)
+    event = df.loc[flat.index, "event"].astype(str).to_numpy()
+    for event_type, template in templates.items():
+        rows = event == event_type
+        if rows.any():
+            x = np.concatenate([records.loc[rows, "from_x"], records.loc[rows, "to_x"]])
+            y = np.concatenate([records.loc[rows, "from_y"], records.loc[rows, "to_y"]])
+            players = template.assign(x, y)
+            records.loc[rows, "from_player"] = players[:rows.sum()]
+            records.loc[rows, "to_player"] = players[rows.sum():]
+    retagged = pd.Series(records.to_dict("records"), index=records.index).groupby(level=0).agg(list)
+    return retagged.reindex(df.index).where(lambda column: column.notna(), passes)
+
+
+# Sparse pass-count matrix (passer x receiver) per (match, team, event)
+def build_networks(df):
+    edges = pass_edges(df)
+    networks = {}
+    for (match, team, event), group in edges.groupby(["match", "team", "event"], sort=False):
+        size = len(FORMATIONS[event])
+        networks[(match, team, event)] = sp.coo_matrix(
+            (np.ones(len(group)), (group["from"].to_numpy(), group["to"].to_numpy())),
+            shape=(size, size),
+        ).tocsr()  # duplicate passes are summed
+    return networks
+
+
+# Pass networks of an uploaded dataset, built once per file (optionally re-tagged with the current templates)
+@st.cache_data(show_spinner=False, max_entries=16)
+def match_networks(data_hash, retag, _df):
+    if retag:
+        _df = _df.assign(passes=retag_passes(_df))
+    return build_networks(_df)
+
+
+# Sum of the networks of one team and event type across matches (all matches when `matches` is None)
+def aggregate(networks, team, event, matches=None):
+    size = len(FORMATIONS[event])
+    total = sp.csr_matrix((size, size))
+    for (match, net_team, net_event), matrix in networks.items():
+        if net_team == team and net_event == event and (matches is None or match in matches):
+            total = total + matrix
+    return total
+
+
+# Degree and eigenvector-type centralities of every player, from sparse matrix products only
+def centrality(matrix, names=None, damping=0.85, iterations=100, tol=1e-10):
+    matrix = sp.csr_matrix(matrix)
+    size = matrix.shape[0]
+    passes_made = np.asarray(matrix.sum(axis=1)).ravel()
+    passes_received = np.asarray(matrix.sum(axis=0)).ravel()
+    total = passes_made.sum()
+
+    # PageRank on the pass-weighted graph: players the ball flows to through well-connected passers rank high
+    out_share = sp.diags(np.divide(1.0, passes_made, out=np.zeros(size), where=passes_made > 0)) @ matrix
+    dangling = passes_made == 0
+    rank = np.full(size, 1.0 / size) if size else np.zeros(0)
+    for _ in range(iterations):
+        updated = damping * (out_share.T @ rank + rank[dangling].sum() / size) + (1 - damping) / size
+        if np.abs(updated - rank).sum() < tol:
+            rank = updated
+            break
+        rank = updated
+
+    return pd.DataFrame({
+        "passes_made": passes_made.astype(int),
+        "passes_received": passes_received.astype(int),
+        "involvement": (passes_made + passes_received) / (2 * total) if total else np.zeros(size),
+        "pagerank": rank,
+    }, index=names)
+
+
+# Node positions of a template in plot coordinates (y up, x stretched to the image aspect ratio)
+# - computed once per event type
+@lru_cache(maxsize=None)
+def formation_layout(event):
+    positions = np.array(list(FORMATIONS[event].values()), dtype=float) * [ASPECT_RATIOS[event], -1.0]
+    positions.setflags(write=False)
+    return positions[:, 0], positions[:, 1]
+
+
+# Directed pass network drawn over the template positions: arrow width ~ pass count,
+# node size ~ involvement
+def network_figure(matrix, event, title=None):
+    x, y = formation_layout(event)
+    names = players(event)
+    matrix = sp.coo_matrix(matrix)
+    metrics = centrality(matrix, names)
+    widest = matrix.data.max() if matrix.nnz else 1
+
+    fig = go.Figure()
+    for passer, receiver, count in zip(matrix.row, matrix.col, matrix.data):
+        if passer == receiver:
+            continue
+        fig.add_annotation(
+            x=x[receiver], y=y[receiver], ax=x[passer], ay=y[passer],
+            xref="x", yref="y", axref="x", ayref="y",
+            showarrow=True, arrowhead=2, arrowsize=1,
+            arrowwidth=1 + 5 * count / widest, arrowcolor="rgba(30, 90, 160, 0.6)",
+            hovertext=f"{names[passer]} → {names[receiver]}: {int(count)}",
+        )
+    fig.add_trace(go.Scatter(
+        x=x, y=y,
+        mode="markers+text",
+        text=names,
+        textposition="top center",
+        marker=dict(size=20 + 60 * metrics["involvement"].to_numpy(), color="#0D3B66"),
+        customdata=metrics[["passes_made", "passes_received"]].to_numpy(),
+        hovertemplate="<b>%{text}</b><br>Passes made: %{customdata[0]}<br>Passes received: %{customdata[1]}<extra></extra>",
+        showlegend=False,
+    ))
+    fig.update_layout(
+        title=title or f"{event} Pass Network",
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor="x"),
+        height=500,
+    )
+    return fig
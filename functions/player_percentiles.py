@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from functions.datasets import load_dataset
+
+# Radar chart categories: player-name column counted, and the conditions the rows must meet
+# (column -> value, or list of accepted values)
+RADAR_CATEGORIES = {
+    'Exclusions': ('exclusion_drawn_by', None),
+    'Assists': ('shot_assisted_by', None),
+    'Shots': ('shot_taken_by', None),
+    'Exclusions Committed': ('exclusion_committed_by', None),
+    'Shots Blocked': ('shot_blocked_by', None),
+    'Turnover committed': ('turned_over_by_x', None),
+    'Turnover won': ('turnover_won_by', None),
+    'Fast Break Goals': ('shot_taken_by', {'shot.isGoal': True, 'shot.isFastBreak': True}),
+    'Direct From Foul': ('shot_taken_by', {'shot.isGoal': True, 'shot.isDirectFromFoul': True}),
+    'Goals': ('shot_taken_by', {'shot.isGoal': True}),
+    'Penalty Goals': ('shot_taken_by', {'shot.isGoal': True, 'shot.type': 'Penalty'}),
+    'Powerplay Goals': ('shot_taken_by', {'shot.isGoal': True, 'shot.type': 'Power_Play'}),
+    'Regular Attack': ('shot_taken_by', {'shot.isGoal': True, 'shot.type': 'Regular_Attack'}),
+    'Offensive Foul': ('turned_over_by_x', {'turnover.type': 'Offensive_Foul'}),
+    'Lost Ball': ('turned_over_by_x', {'turnover.type': ['Lost_Ball', 'Ball_Under']}),
+}
+
+
+# Condition columns are written as in the raw export ('shot.isGoal'); cleaned data uses 'shot_isGoal'
+def _column(data, name):
+    return name if name in data else name.replace('.', '_')
+
+
+# Number of rows per player in `column`, for rows meeting `conditions`
+def category_counts(data, column, conditions=None):
+    mask = pd.Series(True, index=data.index)
+    for cond_col, cond_val in (conditions or {}).items():
+        if isinstance(cond_val, list):
+            mask &= data[_column(data, cond_col)].isin(cond_val)
+        else:
+            mask &= data[_column(data, cond_col)] == cond_val
+    return data.loc[mask, column].dropna().value_counts()
+
+
+# Same result as stats.percentileofscore(values, value, kind='rank') for every value at once
+def percentile_ranks(values):
+    values = np.asarray(values)
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side='left')
+    at_or_below = np.searchsorted(ordered, values, side='right')
+    return (below + at_or_below + (at_or_below > below)) * (50.0 / len(values))
+
+
+class PercentileMatrix:
+    """Player x category matrix of raw counts and percentile ranks for the radar chart.
+
+    Counts are built with one value_counts pass per category; `add` folds in the
+    counts of new match data and re-ranks, without rescanning older data. A player
+    is ranked only against the players who appear in that category.
+    """
+
+    def __init__(self, categories=RADAR_CATEGORIES):
+        self.categories = categories
+        self.counts = pd.DataFrame(columns=list(categories), dtype="int64")
+        self.percentiles = self.counts.astype("float64")
+        self.version = 0  # bumped by every `add` - cache key for figures built from the matrix
+
+    def add(self, data):
+        new_counts = pd.DataFrame({
+            category: category_counts(data, column, conditions)
+            for category, (column, conditions) in self.categories.items()
+        }, columns=list(self.categories))
+        self.counts = self.counts.add(new_counts, fill_value=0).fillna(0).astype("int64")
+        self._rank()
+        self.version += 1
+
+    def _rank(self):
+        percentiles = pd.DataFrame(0.0, index=self.counts.index, columns=self.counts.columns)
+        for category in self.counts.columns:
+            present = self.counts[category] > 0
+            if present.any():
+                percentiles.loc[present, category] = percentile_ranks(self.counts.loc[present, category].to_numpy())
+        self.percentiles = percentiles
+
+    @property
+    def players(self):
+        return sorted(self.counts.index)
+
+    # {category: (percentile, raw count)} - (0, 0) where the player has no entries
+    def lookup(self, player_name):
+        if player_name not in self.counts.index:
+            return {category: (0, 0) for category in self.categories}
+        raw = self.counts.loc[player_name]
+        ranks = self.percentiles.loc[player_name]
+        return {
+            category: (float(ranks[category]), int(raw[category])) if raw[category] > 0 else (0, 0)
+            for category in self.categories
+        }
+
+
+# Matrix for a dataset CSV, built once per process from the shared dataset frame.
+# `signature` (functions.datasets.source_signature) rebuilds it when the CSV changes.
+@st.cache_resource(max_entries=2)
+def shared_percentile_matrix(csv_path, signature):
+    matrix = PercentileMatrix()
+    matrix.add(load_dataset(csv_path))
+    return matrix
@@ -0,0 +1,72 @@
+import pyarrow as pa
+
+# Column schema of the event log captured on the Data Entry page (column -> pandas dtype)
+EVENT_SCHEMA = {
+    "match": "string",
+    "period": "string",
+    "event": "string",
+    "subevent": "string",
+    "result": "string",
+    "time": "string",
+    "team": "string",
+    "shot_type": "string",
+    "turnover_type": "string",
+    "player_in_attack": "Int64",
+    "player_in_defence": "Int64",
+    "x_shot": "float64",  # canvas coordinates are fractions of the canvas size, in [0, 1]
+    "y_shot": "float64",
+    "x_location": "float64",
+    "y_location": "float64",
+    "passes": "object",  # list of pass dicts drawn on the pass map canvas
+    "drive_start_input": "string",
+    "drive_end_input": "string",
+}
+
+EVENT_COLUMNS = list(EVENT_SCHEMA)
+
+# Enumerated values offered by the Data Entry form
+PERIODS = ["1st", "2nd", "3rd", "4th", "OT"]
+EVENTS = ["6v6", "6v5", "Penalty", "Counter"]
+OUTCOMES = ["Goal", "Miss", "Save", "Block", "Turnover", "Exclusion"]
+TEAMS = ["Home", "Away"]
+SHOT_TYPES = ["None", "Skip Shot", "Lob Shot", "Normal Shot"]
+TURNOVER_TYPES = ["None", "Steal", "Bad Pass", "Offensive Foul", "Shot Clock Violation"]
+SUBEVENTS_6V6 = ["None", "Press", "Zone 1-2", "Zone 4-5", "M-Zone"]
+SUBEVENTS_6V5 = ["None", "In 1-2", "In 4-5"]
+DRIVE_STARTS = ["None", "1", "2", "3", "4", "5", "Multiple"]
+DRIVE_ENDS = ["None", "1", "2", "3", "4", "5", "Pit", "Second Pit"]
+
+# Categorical columns of an exported match and their declared categories.
+# The Match Stats page reads the outcome as "outcome"; Data Entry exports it as "result".
+CATEGORIES = {
+    "period": PERIODS,
+    "event": EVENTS,
+    "subevent": SUBEVENTS_6V6 + SUBEVENTS_6V5[1:],
+    "outcome": OUTCOMES,
+    "team": TEAMS,
+    "shot_type": SHOT_TYPES,
+    "turnover_type": TURNOVER_TYPES,
+    "drive_start_input": DRIVE_STARTS,
+    "drive_end_input": DRIVE_ENDS,
+}
+
+# A single pass drawn on the 6v5/6v6 canvas
+PASS_STRUCT = pa.struct([
+    ("pass_id", pa.int64()),
+    ("from_x", pa.float64()),
+    ("from_y", pa.float64()),
+    ("from_player", pa.string()),
+    ("to_x", pa.float64()),
+    ("to_y", pa.float64()),
+    ("to_player", pa.string()),
+])
+
+# Same schema as Arrow types - passes stay a native nested column
+_ARROW_TYPES = {
+    "string": pa.string(),
+    "Int64": pa.int64(),
+    "float64": pa.float64(),
+    "object": pa.list_(PASS_STRUCT),
+}
+
+ARROW_SCHEMA = pa.schema([(column, _ARROW_TYPES[dtype]) for column, dtype in EVENT_SCHEMA.items()])
@@ -0,0 +1,195 @@
+import json
+import math
+import os
+from collections import Counter
+
+import pandas as pd
+import streamlit as st
+
+from functions.datasets import CLEANED_DATA, load_dataset, source_signature
+from functions.momentum import PERIOD_SECONDS, event_seconds
+from functions.schema import TEAMS
+
+# Trained parameters, written by `python -m functions.score_model`
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'score_model.json')
+
+# Regulation time: 4 periods
+MATCH_SECONDS = 4 * PERIOD_SECONDS
+
+# Outcomes that count as a shot attempt
+ATTEMPT_OUTCOMES = {"Goal", "Save", "Miss", "Block"}
+
+# Data Entry event type -> shot type of the Champions League dataset
+EVENT_SHOT_TYPES = {
+    "6v6": "Regular_Attack",
+    "Counter": "Regular_Attack",
+    "6v5": "Power_Play",
+    "Penalty": "Penalty",
+}
+
+# Used until a model has been trained: typical attempts per team per match and conversion per shot type
+DEFAULT_MODEL = {
+    "attempts": {"alpha": 120.0, "beta": 4.0},  # Gamma prior on attempts per match (mean 30)
+    "conversion": {"Regular_Attack": -1.2, "Power_Play": -0.4, "Penalty": 0.85},  # log-odds
+    "attempt_mix": {"Regular_Attack": 0.75, "Power_Play": 0.2, "Penalty": 0.05},
+    "conversion_strength": 20.0,  # pseudo-attempts behind each prior conversion rate
+    "match_seconds": MATCH_SECONDS,
+    "source_signature": None,
+}
+
+
+def _sigmoid(log_odds):
+    return 1 / (1 + math.exp(-log_odds))
+
+
+# -----------------------------
+# Offline training
+# -----------------------------
+# Attempts per team and match are Poisson with a Gamma-distributed rate (fitted by moments on the
+# overdispersion); conversion is a logistic model on shot type, whose maximum-likelihood
+# coefficients are the smoothed log-odds of each type.
+def train(datos, signature=None):
+    shots = datos[datos['shot_isGoal'].notna()]
+    goal = shots['shot_isGoal'].astype(int) == 1
+    shot_type = shots['shot_type'].fillna("Regular_Attack").astype(str)
+
+    attempts = shots.groupby(['matchId', 'shot_teamId']).size()
+    mean = float(attempts.mean())
+    var = float(attempts.var(ddof=1)) if len(attempts) > 1 else mean
+    beta = mean / (var - mean) if var > mean else 50.0  # near-Poisson data: strong prior
+    by_type = pd.DataFrame({"goals": goal, "shot_type": shot_type}).groupby("shot_type")["goals"].agg(["sum", "count"])
+
+    return {
+        "attempts": {"alpha": mean * beta, "beta": beta},
+        "conversion": {
+            shot_type: math.log((row["sum"] + 0.5) / (row["count"] - row["sum"] + 0.5))
+            for shot_type, row in by_type.iterrows()
+        },
+        "attempt_mix": (by_type["count"] / by_type["count"].sum()).to_dict(),
+        "conversion_strength": DEFAULT_MODEL["conversion_strength"],
+        "match_seconds": MATCH_SECONDS,
+        "source_signature": signature,
+    }
+
+
+def save_model(model, path=MODEL_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(model, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def train_from_dataset(csv_path=CLEANED_DATA, path=MODEL_PATH):
+    model = train(load_dataset(csv_path), source_signature(csv_path))
+    save_model(model, path)
+    return model
+
+
+# Version of the trained parameters file, None when nothing was trained yet
+def model_signature(path=MODEL_PATH):
+    return source_signature(path) if os.path.exists(path) else None
+
+
+# Trained parameters, read once per file version - retraining (from the app or
+# `python -m functions.score_model`) is picked up on the next call
+@st.cache_resource(max_entries=2)
+def _read_model(path, signature):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Falls back to DEFAULT_MODEL when nothing was trained yet
+def load_model(path=MODEL_PATH):
+    signature = model_signature(path)
+    return _read_model(path, signature) if signature is not None else DEFAULT_MODEL
+
+
+# -----------------------------
+# Live prediction
+# -----------------------------
+class ScorePredictor:
+    """Predicted final score of a match, updated in O(1) per event.
+
+    Keeps per-team goals and attempts (by shot type) plus the match time reached.
+    The expected remaining goals combine the Gamma-Poisson posterior attempt rate
+    with the Beta-smoothed conversion of each shot type.
+    """
+
+    def __init__(self, model=DEFAULT_MODEL):
+        self.model = model
+        self.types = list(model["attempt_mix"])
+        self.prior_conversion = {t: _sigmoid(model["conversion"].get(t, 0.0)) for t in self.types}
+        self.goals = Counter()
+        self.attempts = Counter()  # team -> attempts
+        self.type_attempts = Counter()  # (team, shot type) -> attempts
+        self.type_goals = Counter()  # (team, shot type) -> goals
+        self.times = Counter()  # match seconds of the events seen, for the time reached
+        self.elapsed = 0.0
+        self.version = 0
+
+    def _event(self, row):
+        values = dict(row)
+        outcome = values.get("outcome") or values.get("result")
+        shot_type = EVENT_SHOT_TYPES.get(values.get("event"), self.types[0] if self.types else None)
+        seconds = event_seconds(values.get("period"), values.get("time"))
+        return values.get("team"), outcome, shot_type, seconds
+
+    def _count(self, row, step):
+        team, outcome, shot_type, seconds = self._event(row)
+        if outcome in ATTEMPT_OUTCOMES:
+            self.attempts[team] += step
+            self.type_attempts[(team, shot_type)] += step
+            if outcome == "Goal":
+                self.goals[team] += step
+                self.type_goals[(team, shot_type)] += step
+        if not math.isnan(seconds):
+            self.times[seconds] += step
+            if step > 0:
+                self.elapsed = max(self.elapsed, seconds)
+            elif not self.times[seconds]:
+                del self.times[seconds]
+                if seconds == self.elapsed:
+                    self.elapsed = max(self.times, default=0.0)
+        self.version += 1
+
+    def add(self, row):
+        self._count(row, 1)
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    # Roll back an event previously passed to `add`
+    def remove(self, row):
+        self._count(row, -1)
+
+    # Expected final goals of a team
+    def predict(self, team):
+        model = self.model
+        fraction = min(self.elapsed / model["match_seconds"], 1.0)
+        attempts = model["attempts"]
+        rate = (attempts["alpha"] + self.attempts[team]) / (attempts["beta"] + fraction)
+        strength = model["conversion_strength"]
+        conversion = sum(
+            model["attempt_mix"][t] * (strength * self.prior_conversion[t] + self.type_goals[(team, t)])
+            / (strength + self.type_attempts[(team, t)])
+            for t in self.types
+        )
+        return self.goals[team] + rate * (1 - fraction) * conversion
+
+    def predictions(self):
+        return {team: self.predict(team) for team in TEAMS}
+
+
+# Predicted final score of an uploaded match, computed once per file and model version
+@st.cache_data(show_spinner=False, max_entries=16)
+def match_predictions(data_hash, model_version, _df):
+    predictor = ScorePredictor(load_model())
+    predictor.extend(_df.to_dict("records"))
+    return predictor.predictions()
+
+
+# Training: python -m functions.score_model
+if __name__ == "__main__":
+    trained = train_from_dataset()
+    print(json.dumps(trained, indent=2))
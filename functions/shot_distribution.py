@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+# Goal mouth in the normalised canvas coordinates stored by the Data Entry page: x0, x1, y0, y1
+GOAL_EXTENT = (0.0, 1.0, 0.0, 1.0)
+
+# Height / width of the goal image, for drawing the zones to scale
+GOAL_ASPECT = 307 / 800
+
+# Outcomes that count as a shot on the goal mouth
+SHOT_OUTCOMES = ["Goal", "Save", "Miss", "Block"]
+
+# Groupings offered for conversion rates
+SHOT_GROUPS = {
+    "Team": ["team"],
+    "Player": ["team", "player_in_attack"],
+    "Shot Type": ["team", "shot_type"],
+}
+
+
+# Zone of every point in a rows x cols grid over `extent` (row 0 = top of the goal), same edge
+# handling as np.histogram2d. Missing or out-of-extent points get zone rows * cols ("unplaced").
+def zone_index(x, y, zones=(3, 3), extent=GOAL_EXTENT):
+    rows, cols = zones
+    x0, x1, y0, y1 = extent
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    col = np.floor((x - x0) / (x1 - x0) * cols)
+    row = np.floor((y - y0) / (y1 - y0) * rows)
+    col = np.where(x == x1, cols - 1, col)  # right/bottom edges belong to the last bin
+    row = np.where(y == y1, rows - 1, row)
+    inside = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+    return np.where(inside, row * cols + col, rows * cols).astype(np.int64)
+
+
+# Shots and goals per zone for every (match, group) at once, with one bincount.
+# Returns {(match, label): array of shape (2, rows * cols + 1)} - [shots, goals] per zone,
+# the last zone holding shots without a goal-mouth position.
+def bin_shots(df, by=("team",), zones=(3, 3), extent=GOAL_EXTENT):
+    by = list(by)
+    outcome = (df["outcome"] if "outcome" in df else df["result"]).astype(str).to_numpy()
+    is_shot = np.isin(outcome, SHOT_OUTCOMES)
+    shots = df.loc[is_shot]
+    if shots.empty:
+        return {}
+    slots = zones[0] * zones[1] + 1
+
+    match = shots["match"].astype(str) if "match" in shots else pd.Series("", index=shots.index)
+    keys = pd.concat([match.rename("match"), shots[by].astype(str)], axis=1)
+    group_codes, groups = pd.MultiIndex.from_frame(keys).factorize()
+    zone = zone_index(shots["x_shot"], shots["y_shot"], zones, extent)
+    goal = outcome[is_shot] == "Goal"
+
+    flat = group_codes * slots + zone
+    size = len(groups) * slots
+    counts = np.stack([
+        np.bincount(flat, minlength=size),
+        np.bincount(flat[goal], minlength=size),
+    ], axis=1).reshape(len(groups), slots, 2).transpose(0, 2, 1)
+
+    return {
+        (key[0], key[1] if len(by) == 1 else key[1:]): counts[i]
+        for i, key in enumerate(groups)
+    }
+
+
+# Zone counts of an uploaded dataset, binned once per file, grouping and grid size
+@st.cache_data(show_spinner=False, max_entries=32)
+def match_zone_counts(data_hash, by, zones, _df):
+    return bin_shots(_df, by, zones)
+
+
+# Season-wide counts per group: a sum of the per-match arrays
+def total_counts(counts, matches=None):
+    totals = {}
+    for (match, label), array in counts.items():
+        if matches is None or match in matches:
+            totals[label] = totals[label] + array if label in totals else array.copy()
+    return totals
+
+
+# Shots, goals and conversion rate per group
+def conversion_table(totals, by=("team",)):
+    by = list(by)
+    labels = list(totals)
+    table = pd.DataFrame(
+        [label if isinstance(label, tuple) else (label,) for label in labels] or None,
+        columns=by,
+    )
+    table["shots"] = [int(totals[label][0].sum()) for label in labels]
+    table["goals"] = [int(totals[label][1].sum()) for label in labels]
+    table["conversion_rate"] = (table["goals"] / table["shots"].where(table["shots"] > 0) * 100).round(1)
+    return table.sort_values(by).reset_index(drop=True)
+
+
+# rows x cols grids of shots, goals and conversion rate (NaN where there were no shots)
+def zone_grid(array, zones=(3, 3)):
+    shots = array[0, :-1].reshape(zones)
+    goals = array[1, :-1].reshape(zones)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(shots > 0, goals / shots * 100, np.nan)
+    return shots, goals, rate
+
+
+# Goal-mouth heatmap of conversion rate per zone, annotated with goals / shots
+def zone_figure(array, zones=(3, 3), title="Conversion by Goal Zone"):
+    shots, goals, rate = zone_grid(array, zones)
+    text = np.char.add(np.char.add(goals.astype(str), " / "), shots.astype(str))
+    fig = go.Figure(go.Heatmap(
+        z=rate,
+        text=text,
+        texttemplate="%{text}",
+        colorscale="YlOrRd",
+        zmin=0,
+        zmax=100,
+        colorbar=dict(title="Conversion (%)"),
+        hovertemplate="Conversion: %{z:.1f}%<br>Goals / shots: %{text}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, autorange="reversed", scaleanchor="x",
+                   scaleratio=GOAL_ASPECT * zones[1] / zones[0]),
+        height=450,
+    )
+    return fig
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Row predicates of the cleaned Champions League shot table
+SHOT_PREDICATES = {
+    "goal": lambda datos: datos['shot_isGoal'] == 1,
+    "no_goal": lambda datos: datos['shot_isGoal'] == 0,
+    "not_penalty": lambda datos: datos['shot_type'] != 'Penalty',
+    "exclusion_drawn": lambda datos: datos['exclusion_byId'] > 0,
+    "blocked": lambda datos: datos['shot_blockedById'] > 0,
+    "direct_from_foul": lambda datos: datos['shot_isDirectFromFoul'] == 1,
+    "power_play": lambda datos: datos['shot_type'] == 'Power_Play',
+    "regular_attack": lambda datos: datos['shot_type'] == 'Regular_Attack',
+}
+
+# Heatmap filters: predicates that must all hold, and the team column the selected team is matched on
+SHOT_FILTERS = {
+    'Goals Scored': (("goal", "not_penalty"), 'shot_teamId'),
+    'Goals Conceded': (("goal", "not_penalty"), 'other_team'),
+    'Exclusions Drawn': (("exclusion_drawn",), 'shot_teamId'),
+    'Blocks Made': (("blocked",), 'shot_teamId'),
+    'Goals Direct From Foul': (("direct_from_foul",), 'shot_teamId'),
+    'Missed Shots': (("no_goal",), 'shot_teamId'),
+    'Power Play Goals Scored': (("power_play", "goal"), 'shot_teamId'),
+    'Power Play Goals Conceded': (("power_play", "goal"), 'other_team'),
+    'Regular Attack Goals Scored': (("regular_attack", "goal"), 'shot_teamId'),
+    'Regular Attack Goals Conceded': (("regular_attack", "goal"), 'other_team'),
+}
+
+_EMPTY = np.array([], dtype=np.intp)
+
+
+class ShotIndex:
+    """Precomputed lookups over the shot table.
+
+    Row positions per team (shooting and conceding side) and per match, plus one
+    packed bitmask per filter. Resolving a filter intersects two small position
+    arrays and tests their bits - no pass over the full table.
+    """
+
+    def __init__(self, datos, predicates=SHOT_PREDICATES, filters=SHOT_FILTERS):
+        self.x = datos['locationX'].fillna(0).replace(np.inf, 0).to_numpy(dtype=float)
+        self.y = datos['locationY'].fillna(0).replace(np.inf, 0).to_numpy(dtype=float)
+        self.filters = filters
+
+        packed = {name: np.packbits(np.asarray(predicate(datos), dtype=bool)) for name, predicate in predicates.items()}
+        self.masks = {
+            name: np.bitwise_and.reduce([packed[predicate] for predicate in required])
+            for name, (required, _) in filters.items()
+        }
+
+        team_columns = {column for _, column in filters.values()}
+        self.positions_by = {column: datos.groupby(column).indices for column in team_columns | {'matchId'}}
+
+    # Row positions of the shots matching filter `value` for a team, in one match (0 = all matches)
+    def positions(self, value, team_id, match_id=0):
+        _, team_column = self.filters[value]
+        rows = self.positions_by[team_column].get(team_id, _EMPTY)
+        if match_id != 0:
+            rows = np.intersect1d(rows, self.positions_by['matchId'].get(match_id, _EMPTY), assume_unique=True)
+        bits = (self.masks[value][rows >> 3] >> (7 - (rows & 7))) & 1
+        return rows[bits.astype(bool)]
+
+    def shots(self, value, team_id, match_id=0):
+        rows = self.positions(value, team_id, match_id)
+        return self.x[rows], self.y[rows]
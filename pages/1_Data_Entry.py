@@ -2,18 +2,36 @@ import streamlit as st
 import pandas as pd
 from streamlit_drawable_canvas import st_canvas
 import math
-from PIL import Image
 from pathlib import Path
 import os
+import uuid
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-
-# Resize function: Scales images to fit canvas max dimensions while preserving aspect ratio
-def resize_for_canvas(img, max_w=800, max_h=500):
-    w, h = img.size
-    scale = min(max_w/w, max_h/h, 1.0)  # Never upscale, fit within bounds
-    new_w, new_h = int(w*scale), int(h*scale)
-    return img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+from functions.event_store import EventStore
+from functions.capture_queue import CaptureQueue, CaptureQueueFull
+from functions.match_session import shared_registry
+from functions.formations import TEMPLATES, canvas_passes
+from functions.canvas import CanvasTracker, last_point
+from functions.assets import canvas_background
+from functions.ingest import to_parquet_bytes, to_feather_bytes
+from functions.schema import (PERIODS, EVENTS, OUTCOMES, TEAMS, SHOT_TYPES, TURNOVER_TYPES,
+                              SUBEVENTS_6V6, SUBEVENTS_6V5, DRIVE_STARTS, DRIVE_ENDS)
+
+load_dotenv()
+
+# Event database: one pooled engine per process, shared by every session. Rows stored in pixels
+# (before coordinates were normalised) are converted with the sizes of the canvases they were clicked on.
+@st.cache_resource
+def get_event_store(url):
+    canvas_sizes = {"shot": canvas_background("goal.jpg").size, "location": canvas_background("pitch.jpg").size}
+    canvas_sizes.update({event: canvas_background(f"{event}.jpg").size for event in TEMPLATES})
+    return EventStore(url, canvas_sizes=canvas_sizes)
+
+# Capture queue: submits only enqueue the event; a background thread writes batches to the event database
+@st.cache_resource
+def get_capture_queue(url):
+    return CaptureQueue(get_event_store(url))
+
+capture_queue = get_capture_queue(os.getenv("EVENTS_DATABASE_URL", "sqlite:///water_polo_events.db"))
 
 # FIRST LINE after imports - Set wide layout for canvas display
 st.set_page_config(layout="wide")
@@ -35,25 +53,43 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialise session state: Create empty events DataFrame with all required columns on first load
-if "events" not in st.session_state:
-        st.session_state.events = pd.DataFrame(columns=["match", "period", "event", 
-                                                        "subevent", "result", "time", 
-                                                        "team", "shot_type","turnover_type", 
-                                                        "player_in_attack", "player_in_defence",
-                                                        "x_shot", "y_shot", "x_location", 
-                                                        "y_location", "passes", "drive_start_input", "drive_end_input"])
-        
+# Initialise session state: every tab is one writer with its own id; the match id starts at the
+# last match in the event database so a restart carries on where capture stopped
+if "writer_id" not in st.session_state:
+        st.session_state.writer_id = f"spotter-{uuid.uuid4().hex[:6]}"
+        st.session_state.default_match = capture_queue.latest_match() or ""
+
 # Canvas versioning: Incremented to force canvas redraw/clear after form submission
 if "canvas_version" not in st.session_state:
     st.session_state.canvas_version = 0
 
+# Canvas objects already turned into passes, per canvas key - reruns only process newly drawn lines
+if "canvas_tracker" not in st.session_state:
+    st.session_state.canvas_tracker = CanvasTracker()
+
 st.title("🕒 Data Entry")
 
+# Backlog indicator: events captured but not yet written to the database
+queue_status = capture_queue.status()
+if queue_status["last_error"]:
+    st.warning(f"⚠️ {queue_status['pending']} events waiting to be saved - retrying ({queue_status['last_error']})")
+elif queue_status["pending"]:
+    st.caption(f"⏳ Saving {queue_status['pending']} events...")
+else:
+    st.caption("💾 All events saved")
+
 # Basic event metadata inputs
-match_input = st.text_input("Match Id")
-period_input = st.radio('Period', ["1st", "2nd", "3rd", "4th", "OT"], horizontal=True)
-event_input = st.radio('Event', ['6v6', '6v5', 'Penalty', 'Counter'], horizontal=True)
+writer_id = st.text_input("Spotter", key="writer_id", help="Undo only removes the events entered under this name")
+match_input = st.text_input("Match Id", value=st.session_state.default_match)
+
+# Shared live session of the match (events log, stats counters, momentum tracker, score predictor), one
+# per process: every tab entering this match id writes to it and the Match Stats page reads it directly.
+# Created on first use from the stored rows of the match plus any not flushed yet.
+match_session = shared_registry().session(match_input, loader=capture_queue.load_events)
+st.session_state.match_session = match_session
+st.caption(f"{len(match_session)} events in match '{match_input}'")
+period_input = st.radio('Period', PERIODS, horizontal=True)
+event_input = st.radio('Event', EVENTS, horizontal=True)
 
 st.markdown("### Click where the ball went on the goal")
 
@@ -61,13 +97,11 @@ st.markdown("### Click where the ball went on the goal")
 x_shot = y_shot = None
 x_location = y_location = None
 
-# Pass coordinates (will be populated from pass map canvas)
-x1 = y1 = x2 = y2 = None
-From_Player = To_Player = None
+# Passes (will be populated from pass map canvas)
+all_passes = []  # Stays empty for events without a pass map
 
-# Goal canvas: Load and resize goal image, create point-drawing canvas
-bg_image = Image.open("goal.jpg")
-bg_image = resize_for_canvas(bg_image)
+# Goal canvas: Goal image resized to fit the canvas (decoded once per process), create point-drawing canvas
+bg_image = canvas_background("goal.jpg")
 goal_width, goal_height = bg_image.size
 
 goal_canvas = st_canvas(
@@ -85,9 +119,8 @@ goal_canvas = st_canvas(
 
 st.markdown("### Click where the ball went on the pitch")
 
-# Pitch canvas: Load and resize pitch image, create point-drawing canvas
-bg_image_pitch = Image.open("pitch.jpg")
-bg_image_pitch = resize_for_canvas(bg_image_pitch)
+# Pitch canvas: Resized pitch image (cached), create point-drawing canvas
+bg_image_pitch = canvas_background("pitch.jpg")
 pitch_width, pitch_height = bg_image_pitch.size
 pitch_canvas = st_canvas(
         fill_color="rgba(255, 0, 0, 0.3)",  # Click marker color
@@ -102,23 +135,19 @@ pitch_canvas = st_canvas(
         key=f"pitch_canvas_{st.session_state.canvas_version}",
     )
 
-# Extract shot coordinates from goal canvas (takes LAST point drawn - most recent click)
-if goal_canvas.json_data is not None:
-        for obj in goal_canvas.json_data["objects"]:
-            x_shot, y_shot = obj["left"], obj["top"]  # Point coords = left/top
+# Extract shot coordinates from goal canvas (takes LAST point drawn - most recent click),
+# stored as fractions of the canvas size
+x_shot, y_shot = last_point(goal_canvas.json_data, goal_width, goal_height)
 
 # Extract location coordinates from pitch canvas (takes LAST point drawn)
-if pitch_canvas.json_data is not None:
-        for obj in pitch_canvas.json_data["objects"]:
-            x_location, y_location = obj["left"], obj["top"]
+x_location, y_location = last_point(pitch_canvas.json_data, pitch_width, pitch_height)
 
 st.subheader("🏐 Pass Map")
 
 # 6v5 Pass Map Logic
 if event_input == "6v5":
-    # Load and resize 6v5 pass map image
-    bg_image_pass = Image.open("6v5.jpg")
-    bg_image_pass = resize_for_canvas(bg_image_pass)
+    # Resized 6v5 pass map image (cached)
+    bg_image_pass = canvas_background("6v5.jpg")
     pass_width, pass_height = bg_image_pass.size
 
     # Draw the pool/field - LINE drawing canvas for passes
@@ -138,49 +167,19 @@ if event_input == "6v5":
     # Initialize empty list to store all pass data
     all_passes = []
 
-    # Parse all lines from 6v5 canvas
+    # Parse all lines from 6v5 canvas: endpoints snapped to the closest player/post of the 6v5 template
+    # (normalised canvas coordinates, shared with the pass network) in one vectorised lookup.
+    # Only lines drawn since the last rerun are resolved; earlier ones come from the tracker.
     if canvas_result3.json_data is not None:
-        objects = canvas_result3.json_data.get("objects", [])
-        for i, obj in enumerate(objects):
-            if obj.get("type") == "line":
-                # Extract absolute coordinates: bounding_box_position + relative_endpoints
-                x1 = obj["left"] + obj["x1"]
-                y1 = obj["top"] + obj["y1"]
-                x2 = obj["left"] + obj["x2"]
-                y2 = obj["top"] + obj["y2"]
-
-            # 6v5 player/post positions (calibrated to resized canvas)
-            player_position_values_6v5 = {
-                'player1': (680, 120),
-                'player2': (480, 320),
-                'player4': (300, 315),
-                'player5': (130, 120),
-                'Second Post': (300, 120),
-                'First Post': (480, 120),
-            }
-
-            # Find closest player/post to pass endpoints using Euclidean distance
-            def closest_player(x,y):
-                return min(
-                    player_position_values_6v5,
-                    key = lambda player: (player_position_values_6v5[player][0] -x)**2 + (player_position_values_6v5[player][1]-y)**2
-                )
-
-            from_player = closest_player(x1,y1)
-            to_player = closest_player(x2,y2)
-
-            # Store complete pass data
-            all_passes.append({
-                "pass_id": i,
-                "from_x": x1, "from_y": y1, "from_player": from_player,
-                "to_x": x2, "to_y": y2, "to_player": to_player
-            })
+        all_passes = st.session_state.canvas_tracker.collect(
+            f"pass_canvas_{st.session_state.canvas_version}", canvas_result3.json_data,
+            lambda objects, indices: canvas_passes(objects, TEMPLATES["6v5"], pass_width, pass_height, indices),
+        )
 
 # 6v6 Pass Map Logic  
 if event_input == "6v6":
-    # Load and resize 6v6 pass map image
-    bg_image_pass1 = Image.open("6v6.jpg")
-    bg_image_pass1 = resize_for_canvas(bg_image_pass1)
+    # Resized 6v6 pass map image (cached)
+    bg_image_pass1 = canvas_background("6v6.jpg")
     pass1_width, pass1_height = bg_image_pass1.size
 
     # Draw the pool/field - LINE drawing canvas for passes
@@ -200,58 +199,29 @@ if event_input == "6v6":
     # Initialize empty list to store all pass data
     all_passes = []
 
-    # Parse all lines from 6v6 canvas
+    # Parse all lines from 6v6 canvas: endpoints snapped to the closest player/pit of the 6v6 template
+    # (normalised canvas coordinates, shared with the pass network) in one vectorised lookup.
+    # Only lines drawn since the last rerun are resolved; earlier ones come from the tracker.
     if canvas_result4.json_data is not None:
-        objects = canvas_result4.json_data.get("objects", [])
-        for i, obj in enumerate(objects):
-            if obj.get("type") == "line":
-                # Extract absolute coordinates: bounding_box_position + relative_endpoints
-                x1 = obj["left"] + obj["x1"]
-                y1 = obj["top"] + obj["y1"]
-                x2 = obj["left"] + obj["x2"]
-                y2 = obj["top"] + obj["y2"]
-
-            # 6v6 player/pit positions (calibrated to resized canvas)
-            player_position_values_6v6 = {
-                'player1': (650, 120),
-                'player2': (550, 310),
-                'player3': (400, 375),
-                'player4': (250, 310),
-                'player5': (150, 120),
-                'pit': (400, 120),
-            }
-
-            # Find closest player/pit to pass endpoints using Euclidean distance
-            def closest_player(x,y):
-                return min(
-                    player_position_values_6v6,
-                    key = lambda player: (player_position_values_6v6[player][0] -x)**2 + (player_position_values_6v6[player][1]-y)**2
-                )
-
-            from_player = closest_player(x1,y1)
-            to_player = closest_player(x2,y2)
-
-            # Store complete pass data
-            all_passes.append({
-                "pass_id": i,
-                "from_x": x1, "from_y": y1, "from_player": from_player,
-                "to_x": x2, "to_y": y2, "to_player": to_player
-            })
+        all_passes = st.session_state.canvas_tracker.collect(
+            f"6v6_canvas_{st.session_state.canvas_version}", canvas_result4.json_data,
+            lambda objects, indices: canvas_passes(objects, TEMPLATES["6v6"], pass1_width, pass1_height, indices),
+        )
 
 # Event entry form with auto-clear on submit
 with st.form('Quick Add', clear_on_submit=True):
-    result_input = st.radio('Outcome', ["Goal", "Miss", "Save", "Block", "Turnover", "Exclusion"], horizontal=True)
+    result_input = st.radio('Outcome', OUTCOMES, horizontal=True)
     time_input = st.text_input("Time (e.g., 12:34)")
-    team_input = st.radio('Team', ["Home", "Away"], horizontal=True)
-    shot_input = st.radio("Shot Type", ["None", "Skip Shot", "Lob Shot", "Normal Shot"], horizontal=True)
-    turnover_input = st.radio("Turnover Type", ["None", "Steal", "Bad Pass", "Offensive Foul", "Shot Clock Violation"], horizontal=True)
-    subevent6v6_input = st.radio("6v6 Subevent", ["None", "Press", "Zone 1-2", "Zone 4-5", "M-Zone"], horizontal=True)   
-    subevent6v5_input = st.radio("6v5 Subevent", ["None", "In 1-2", "In 4-5"], horizontal=True) 
+    team_input = st.radio('Team', TEAMS, horizontal=True)
+    shot_input = st.radio("Shot Type", SHOT_TYPES, horizontal=True)
+    turnover_input = st.radio("Turnover Type", TURNOVER_TYPES, horizontal=True)
+    subevent6v6_input = st.radio("6v6 Subevent", SUBEVENTS_6V6, horizontal=True)   
+    subevent6v5_input = st.radio("6v5 Subevent", SUBEVENTS_6V5, horizontal=True) 
     player_number = [i for i in range(1,15)]
     playerattack_input = st.radio("Player in attack", player_number, horizontal=True)
     playerdefence_input = st.radio("Player in defence", player_number, horizontal=True)
-    drive_start_input = st.radio("Drive From", ["None", "1", "2", "3", "4", "5", "Multiple"] ,horizontal=True)
-    drive_end_input = st.radio("Drive To", ["None", "1", "2", "3", "4", "5", "Pit", "Second Pit"] ,horizontal=True)
+    drive_start_input = st.radio("Drive From", DRIVE_STARTS ,horizontal=True)
+    drive_end_input = st.radio("Drive To", DRIVE_ENDS ,horizontal=True)
 
     submitted = st.form_submit_button('Add event')
     if submitted:
@@ -277,17 +247,59 @@ with st.form('Quick Add', clear_on_submit=True):
                 "drive_end_input": drive_end_input                                                                                                                                                                                                                                                                                                                                                                       
             }
             
-            # Append new event to session state DataFrame
-            st.session_state.events = pd.concat([st.session_state.events, pd.DataFrame([new_row])], ignore_index=True)
+            # Add the event to the shared match session under this tab's next sequence number (merged by
+            # period/time, live trackers updated), then queue it for the background writer (never waits on
+            # the database)
+            stored_row = match_session.add(writer_id, new_row)
+            try:
+                capture_queue.enqueue(stored_row)
+            except CaptureQueueFull as error:
+                match_session.remove(writer_id, stored_row["seq"])
+                st.error(f"Event not added - the database is not keeping up ({error}).")
+                st.stop()
             st.success("Event added! Canvases cleared.")
             st.session_state.canvas_version += 1  # Force all canvases to clear/redraw
+            st.session_state.canvas_tracker.clear()  # Old canvas keys are gone
             st.rerun()  # Refresh app with cleared canvases and form
 
-# Export all collected events as CSV
-csv = st.session_state.events.to_csv(index=False).encode('utf-8')
+# Undo: remove this tab's last event from the match session (and its trackers) and from the database;
+# events captured by other tabs are left alone
+if match_session.last_event(writer_id) is not None and st.button("↩️ Undo last event"):
+    removed_row = match_session.undo(writer_id)
+    if removed_row is not None:
+        capture_queue.cancel(removed_row["match"], writer_id, removed_row["seq"])
+    st.rerun()
+
+# Export files of a match, serialised once per session version (not on every click) and shared by every tab.
+# The session token keeps a reseeded session (versions restart) from reusing an older session's files.
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_files(token, version, _session):
+    events_table = _session.to_arrow()
+    return {
+        "csv": _session.to_frame().to_csv(index=False).encode('utf-8'),
+        # Columnar exports keep passes as a nested list<struct> column instead of a Python repr string
+        "parquet": to_parquet_bytes(events_table),
+        "feather": to_feather_bytes(events_table),
+    }
+
+exports = export_files(match_session.token, match_session.version, match_session)
+
+# Export all collected events as CSV, Parquet or Feather
 st.download_button(
 label="📥 Export all as CSV",
-data=csv,
+data=exports["csv"],
 file_name="water_polo_events.csv",
 mime="text/csv"
 )
+st.download_button(
+label="📥 Export all as Parquet",
+data=exports["parquet"],
+file_name="water_polo_events.parquet",
+mime="application/vnd.apache.parquet"
+)
+st.download_button(
+label="📥 Export all as Feather",
+data=exports["feather"],
+file_name="water_polo_events.feather",
+mime="application/vnd.apache.arrow.file"
+)
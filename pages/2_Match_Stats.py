@@ -4,30 +4,63 @@ import plotly.express as px
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go 
+from functions.match_cube import match_cube, period_cube, period_tables, slice_period
+from functions.figure_cache import shared_figure_cache
+from functions.live_stats import LiveStats
+from functions.match_session import live_session, shared_registry
+from functions.momentum import match_momentum, momentum_figure
+from functions.score_model import match_predictions, model_signature
+from functions.ingest import file_hash, file_kind, load_events
+
 st.title("📊 Team Stats")
 
 st.title("Upload and store CSV")
 
 # 1️⃣ File uploader
-uploaded_file = st.file_uploader("Upload a CSV", type=["csv"])
+uploaded_file = st.file_uploader("Upload a CSV, Parquet or Feather export", type=["csv", "parquet", "feather"])
 
 if "all" not in st.session_state:
         st.session_state.all = pd.DataFrame(columns=["time", "team", "event", "subevent", "outcome", "type", "period"])
 
 # 2️⃣ If file uploaded, load and store in session_state
+# Parsed with the declared export schema (categorical columns, time in seconds), cached by file hash
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
+    uploaded_bytes = uploaded_file.getvalue()
+    st.session_state.my_data_hash = file_hash(uploaded_bytes)
+    df = load_events(st.session_state.my_data_hash, file_kind(uploaded_file.name), uploaded_bytes)
     st.session_state.my_data = df 
 
 ## 
 ## Header metrics
 ##
 
+# Live matches: read straight from the process-wide match sessions the Data Entry tabs write to
+live_matches = shared_registry().matches()
+session = None
+if "my_data" not in st.session_state and live_matches:
+    current = live_session()
+    default = live_matches.index(current.match) if current is not None and current.match in live_matches else 0
+    session = shared_registry().get(st.selectbox("Live match", live_matches, index=default))
+
 # Usa los datos existentes si no se subió nada nuevo
+# Stats counters: built once from an uploaded match, or the live counters of the match session
 if "my_data" in st.session_state:
     df = st.session_state.my_data
+    data_hash = st.session_state.my_data_hash
+    stats = LiveStats.from_cube(match_cube(data_hash, df))
+elif session is not None:
+    df = session.to_frame()
+    stats = None  # live counters are only read through the session's locked snapshots
 else:
     df = st.session_state.all
+    stats = LiveStats()
+
+# Live mode: the scoreboard and every section are Streamlit fragments that re-read the match session on a
+# timer, so a tick reruns only that fragment - the scoreboard every second, the sections every `refresh` seconds
+live = session is not None and st.sidebar.toggle("Live mode", value=True)
+refresh = st.sidebar.slider("Section refresh (seconds)", 1, 60, 5, disabled=not live)
+SCOREBOARD_EVERY = 1 if live else None
+SECTIONS_EVERY = refresh if live else None
 
 
 if "minute" not in st.session_state.all:
@@ -35,18 +68,29 @@ if "minute" not in st.session_state.all:
     st.session_state.team_a_score = 0
     st.session_state.team_b_score = 0
 
-home_team_score = (
-     ((df['team']=='Home') & (df['type']=='event_input') & (df['outcome']=='Goal')).sum()
-     
-)
-
-away_team_score = (
-     ((df['team']=='Away') & (df['type']=='event_input') & (df['outcome']=='Goal')).sum()
-)
-
 if df is not None:
     df.sort_values(by=['time', 'period'], ascending=[False, False])
 
+# Inputs of the fragments, re-read on every fragment run: an upload only changes with a full rerun,
+# the match session changes under the page while it is shown
+def current_frame():
+    return session.to_frame() if "my_data" not in st.session_state and session is not None else df
+
+def data_version():
+    if "my_data" in st.session_state:
+        return data_hash
+    if session is not None:
+        return f"live-{session.token}-{session.version}"
+    return "empty"  # no upload and no live match: fresh, empty counters on every run
+
+# Last inputs and outputs of every fragment in this browser session: a tick whose data version did not
+# change reuses what the previous run built instead of slicing the counters or hitting the shared caches
+def memo(name, key, build):
+    store = st.session_state.setdefault("fragment_memo", {})
+    if name not in store or store[name][0] != key:
+        store[name] = (key, build())
+    return store[name][1]
+
 def get_latest_minute(df):
     if not df.empty:
         ultimo_minuto = df['time'].iloc[-1]
@@ -59,10 +103,28 @@ def get_current_period(df):
         return periodo_actual 
     return 0
 
-col1, col2, col3 = st.columns([2, 2, 2])
-col1.metric("Home Team", home_team_score, delta="Pred: 8")
-col2.metric("Time", get_latest_minute(df), delta=f"Period: {get_current_period(df)}")
-col3.metric("Away Team", away_team_score, delta="Pred: 6")
+# Scores and predicted final score: computed once per upload, or read from the counters and predictor of the match session
+@st.fragment(run_every=SCOREBOARD_EVERY)
+def scoreboard():
+    df_live = current_frame()
+    if "my_data" in st.session_state:
+        predictions = match_predictions(data_hash, model_signature(), df_live)
+    elif session is not None:
+        predictions = memo("predictions", data_version(), session.predictions)
+    else:
+        predictions = None
+
+    def prediction_delta(team):
+        return f"Pred: {predictions[team]:.0f}" if predictions else None
+
+    score = session.score if session is not None else stats.score
+
+    col1, col2, col3 = st.columns([2, 2, 2])
+    col1.metric("Home Team", score('Home'), delta=prediction_delta('Home'))
+    col2.metric("Time", get_latest_minute(df_live), delta=f"Period: {get_current_period(df_live)}")
+    col3.metric("Away Team", score('Away'), delta=prediction_delta('Away'))
+
+scoreboard()
 
 st.divider()
 
@@ -72,26 +134,51 @@ period = st.selectbox(
         ['1st', '2nd', '3rd', '4th', "OT"]
     )
 
-    # Filter dataframe
-if period != "All":
-        df_filtered = df[df["period"] == period]
-else:
-    df_filtered = df
+figure_cache = shared_figure_cache()
+
+# Tables of one section for the selected period. The period cube is built once per data version (for an
+# upload: once per file, or read from the live counters) and only the tables the section shows are built,
+# cached per (data version, period)
+def section_inputs(*names):
+    version = data_version()
+    if "my_data" in st.session_state:
+        cube = period_cube(data_hash, period, df)
+    else:
+        cube = memo("cube", (version, period), lambda: slice_period(session.cube() if session is not None else stats.to_cube(), period))
+    tables = memo(("tables",) + names, (version, period), lambda: period_tables(version, period, cube, names))
+    return {name: table.copy() for name, table in tables.items()}  # sections relabel their columns
+
+# Figures are cached per (data version, period): identical selections, from any session, skip both the
+# aggregation and the figure construction
+def cached_figure(name, build):
+    key = (data_version(), period, name)
+    return memo(("figure", name), key, lambda: figure_cache.get_or_build(key, build))
+
+# Section switch: a section that is off returns before touching any data
+def section_open(title, value=False):
+    return st.toggle(title, value=value, key=f"section_{title}")
+
+st.sidebar.caption(f"Figure cache: {figure_cache.hits} hits / {figure_cache.misses} misses")
+
 ##
 ## Event graphs
 ##
 
-with st.expander('Events'):
+@st.fragment(run_every=SECTIONS_EVERY)
+def events_section():
+    if not section_open('Events'):
+        return
 
-    df_counts = df_filtered.groupby(['event', 'team']).size().reset_index(name='count')
+    tables = section_inputs('event_counts', 'event_success')
 
-    df_counts['count'] = pd.to_numeric(df_counts['count'], errors='coerce')
+
+    df_counts = tables['event_counts']
 
     # Asegurarte de que 'event' y 'team' sean strings
     df_counts['event'] = df_counts['event'].astype(str)
 
     # Matplotlib + Streamlit
-    fig1 = px.bar(
+    fig1 = cached_figure('events_by_team', lambda: px.bar(
         df_counts,
         x = 'event',
         y = 'count',
@@ -101,42 +188,15 @@ with st.expander('Events'):
         labels={"count": "Number of Events",
                 "event": "Event Type",
                 "team": "Team"}
-    )
-
-    fig1.update_layout(height=700)
+    ).update_layout(height=700))
 
     ## Event success graphs 
 
-    df_counts = df_filtered.groupby(['event', 'team', 'outcome']).size().reset_index(name='count')
-
-    # Filtrado 6v5 y proporciones
-    df_6v5 = df_filtered[df_filtered['event'] == '6v5'].groupby(['team', 'outcome']).size().reset_index(name='count')
-    df_6v5['proportion'] = df_6v5.groupby('team')['count'].transform(lambda x: x / x.sum())
-
-    # Goals por team y subevent
-
-    goals_scored = df_counts[(df_counts['outcome'] == 'Goal')].groupby(['team', 'event']).size().reset_index(name='goals_scored')
-
-    exclusions_drawn = df_counts[(df_counts['outcome'] == 'Exclusion')].groupby(['team', 'event']).size().reset_index(name='exclusions_drawn')
-
-    # Intentos por team y subevent (excluyendo 'Exclusion')
-    attempts_made = (df_counts.groupby(['team', 'event'])['count'].sum().reset_index(name='attempts_made'))
-
-    # Exclusion success rate por team
-    exclusion_success_rate = df_6v5[df_6v5['outcome'] == 'Goal'][['team', 'proportion']]
-
-    df_all = (goals_scored
-            .merge(exclusions_drawn, on=['team', 'event'], how='outer')
-            .merge(attempts_made, on=['team','event'], how='outer')
-                .merge(exclusion_success_rate, on=['team'], how='outer')
-    )
-
-    df_all.fillna(0, inplace=True)
-
-    df_all['success_rate'] = ((df_all['goals_scored'] + (df_all['exclusions_drawn'] * df_all['proportion'])) / df_all['attempts_made']) * 100 
+    # Goals, exclusions drawn, attempts and 6v5 goal proportion per team and event
+    df_all = tables['event_success']
 
 
-    fig2 = px.bar(
+    fig2 = cached_figure('events_success', lambda: px.bar(
         df_all,
         x = 'event',
         y = 'success_rate',
@@ -146,9 +206,7 @@ with st.expander('Events'):
         labels={"success_rate": "Success Rate (%)",
                 "event": "Event Type",
                 "team": "Team"}
-    )
-
-    fig2.update_layout(height=700)
+    ).update_layout(height=700))
 
     df_all.columns = ['Team', 'Event', 'Goals Scored', 'Exclusions Drawn', 'Attempts Made', 'Goal Proportion', 'Success Rate']
 
@@ -162,16 +220,21 @@ with st.expander('Events'):
     with col2:
         st.plotly_chart(fig2, use_container_width=True)
 
+events_section()
+
 ##
 ## Subevent graphs
 ##
 
-with st.expander('Subevents'):
+@st.fragment(run_every=SECTIONS_EVERY)
+def subevents_section():
+    if not section_open('Subevents'):
+        return
 
-    df_subcounts = df_filtered.groupby(['subevent', 'team']).size().reset_index(name='count')
+    tables = section_inputs('subevent_counts', 'subevent_success')
 
 
-    df_subcounts['count'] = pd.to_numeric(df_subcounts['count'], errors='coerce')
+    df_subcounts = tables['subevent_counts']
 
     # Asegurarte de que 'event' y 'team' sean strings
     df_subcounts['subevent'] = df_subcounts['subevent'].astype(str)
@@ -179,7 +242,7 @@ with st.expander('Subevents'):
 
 
     # Matplotlib + Streamlit
-    fig1 = px.bar(
+    fig1 = cached_figure('subevents_by_team', lambda: px.bar(
         df_subcounts,
         x = 'subevent',
         y = 'count',
@@ -189,42 +252,14 @@ with st.expander('Subevents'):
         labels={"count": "Number of Events",
                 "subevent": "Subevent Type",
                 "team": "Team"}
-    )
-
-
-    # Conteo y proporciones generales
-    df_counts = df_filtered.groupby(['event', 'subevent', 'team', 'outcome']).size().reset_index(name='count')
-
+    ))
 
-    # Filtrado 6v5 y proporciones
-    df_6v5 = df_filtered[df_filtered['event'] == '6v5'].groupby(['team', 'outcome']).size().reset_index(name='count')
-    df_6v5['proportion'] = df_6v5.groupby('team')['count'].transform(lambda x: x / x.sum())
 
+    # Goals, exclusions drawn, attempts and 6v5 goal proportion per team and subevent
+    df_all = tables['subevent_success']
 
-    # Goals por team y subevent
 
-    goals_scored = df_counts[(df_counts['outcome'] == 'Goal')].groupby(['team', 'subevent']).size().reset_index(name='goals_scored')
-
-    exclusions_drawn = df_counts[(df_counts['outcome'] == 'Exclusion')].groupby(['team', 'subevent']).size().reset_index(name='exclusions_drawn')
-
-    # Intentos por team y subevent (excluyendo 'Exclusion')
-    attempts_made = (df_counts.groupby(['team', 'subevent'])['count'].sum().reset_index(name='attempts_made'))
-
-    # Exclusion success rate por team
-    exclusion_success_rate = df_6v5[df_6v5['outcome'] == 'Goal'][['team', 'proportion']]
-
-    df_all = (goals_scored
-            .merge(exclusions_drawn, on=['team', 'subevent'], how='outer')
-            .merge(attempts_made, on=['team','subevent'], how='outer')
-                .merge(exclusion_success_rate, on=['team'], how='outer')
-    )
-
-    df_all.fillna(0, inplace=True)
-
-    df_all['success_rate'] = ((df_all['goals_scored'] + (df_all['exclusions_drawn'] * df_all['proportion'])) / df_all['attempts_made']) * 100 
-
-
-    fig2 = px.bar(
+    fig2 = cached_figure('subevents_success', lambda: px.bar(
         df_all,
         x = 'subevent',
         y = 'success_rate',
@@ -234,7 +269,7 @@ with st.expander('Subevents'):
         labels={"success_rate": "Success Rate (%)",
                     "subevent": "Subevent Type",
                     "team": "Team"}
-    )
+    ))
 
     df_all.columns = ['Team', 'Subevent', 'Goals Scored', 'Exclusions Drawn', 'Attempts Made', 'Goal Proportion', 'Success Rate']
 
@@ -248,37 +283,33 @@ with st.expander('Subevents'):
     with col2:
         st.plotly_chart(fig2, use_container_width=True)
 
+subevents_section()
+
 ##
 ## Save graphs - Save number and percentage
 ##
-with st.expander('Saves'):
-    df_saves = df_filtered[(df_filtered['outcome'] == 'Save')].groupby(['team', 'event', 'subevent', 'player_affected']).size().reset_index(name='count')
+@st.fragment(run_every=SECTIONS_EVERY)
+def saves_section():
+    if not section_open('Saves'):
+        return
 
-    df_saves['team_player'] = df_saves['team'] + ' - ' + df_saves['player_affected']
+    tables = section_inputs('saves')
+    df_all = tables['saves']
 
-    fig1 = px.bar(
-        df_saves,
+    fig1 = cached_figure('saves_count', lambda: px.bar(
+        df_all.dropna(subset=['count_saves']),
         x = 'subevent',
-        y = 'count',
+        y = 'count_saves',
         color = 'team_player',
         barmode = 'group',
         title="Saves by Team and Subevent",
-        labels={"count": "Number of Saves",
+        labels={"count_saves": "Number of Saves",
                 "subevent": "Subevent Type",
                 "team": "Team"}
-    )
-
-
-    shots_taken = df_filtered[(df_filtered['outcome'] == 'Save') | (df_filtered['outcome'] == 'Miss') | (df_filtered['outcome'] == 'Goal')].groupby(['team', 'event', 'subevent', 'player_affected']).size().reset_index(name='count')
-
-    df_all = (df_saves            
-              .merge(shots_taken, on=['team', 'event', 'subevent', 'player_affected'], how='outer', suffixes=('_saves', '_shots'))
-    )
-
-    df_all['save_success_rate'] = (df_all['count_saves'] / df_all['count_shots']) * 100
+    ))
 
     
-    fig2 = px.bar(
+    fig2 = cached_figure('saves_rate', lambda: px.bar(
         df_all,
         x = 'subevent',
         y = 'save_success_rate',
@@ -288,7 +319,7 @@ with st.expander('Saves'):
         labels={"save_success_rate": "Save Percentage (%)",
                 "subevent": "Subevent Type",
                 "team": "Team"}
-    )
+    ))
 
     df_all.columns = ['Team', 'Event', 'Subevent', 'Player Affected', 'Saves', 'Team + Player', 'Attempts Made', 'Save Success Rate']
     st.dataframe(df_all)
@@ -301,13 +332,21 @@ with st.expander('Saves'):
     with col2:
         st.plotly_chart(fig2, use_container_width=True)
 
+saves_section()
+
 ##
 ## Shot type pie chart
 ##
 
-with st.expander('Shot Types'):
+@st.fragment(run_every=SECTIONS_EVERY)
+def shot_types_section():
+    if not section_open('Shot Types'):
+        return
+
+    tables = section_inputs('shot_types', 'shot_goals')
+
 
-    df_shots = df_filtered[(df_filtered['shot_type'] == 'Skip Shot') | (df_filtered['shot_type'] == 'Lob Shot') | (df_filtered['shot_type'] == 'Normal Shot')].groupby(['team', 'shot_type']).size().reset_index(name='count')
+    df_shots = tables['shot_types']
 
 
     df_shotshome = df_shots[(df_shots['team'] == 'Home')]
@@ -319,19 +358,19 @@ with st.expander('Shot Types'):
     st.dataframe(df_shotshome)
     st.dataframe(df_shotsaway)
 
-    fig1 = px.pie(
+    fig1 = cached_figure('shot_types_home', lambda: px.pie(
         df_shotshome,
         values='Count',
         names='Shot Type',
         title='Home Shot Types'
-    )
+    ))
 
-    fig2 = px.pie(
+    fig2 = cached_figure('shot_types_away', lambda: px.pie(
         df_shotsaway,
         values='Count',
         names='Shot Type',
         title='Away Shot Types'
-    )   
+    ))   
 
     col1, col2 = st.columns(2)
 
@@ -342,9 +381,7 @@ with st.expander('Shot Types'):
         st.plotly_chart(fig2, use_container_width=True)
 
 
-    df_shots = df_filtered[(df_filtered['shot_type'] == 'Skip Shot') | (df_filtered['shot_type'] == 'Lob Shot') | (df_filtered['shot_type'] == 'Normal Shot')].groupby(['team', 'shot_type', 'outcome']).size().reset_index(name='count')
-
-    df_goals = df_shots[df_shots['outcome'] == 'Goal'].groupby(['team', 'shot_type']).size().reset_index(name='count')
+    df_goals = tables['shot_goals']
 
 
     df_shotshome = df_goals[(df_goals['team'] == 'Home')]
@@ -352,19 +389,19 @@ with st.expander('Shot Types'):
 
     
 
-    fig1 = px.pie(
+    fig1 = cached_figure('shot_goals_home', lambda: px.pie(
         df_shotshome,
         values='count',
         names='shot_type',
         title='Home Shot Percentages'
-    )
+    ))
 
-    fig2 = px.pie(
+    fig2 = cached_figure('shot_goals_away', lambda: px.pie(
         df_shotsaway,
         values='count',
         names='shot_type',
         title='Away Shot Percentages'
-    )   
+    ))   
 
     col1, col2 = st.columns(2)
 
@@ -380,6 +417,8 @@ with st.expander('Shot Types'):
     with col2:
         st.plotly_chart(fig2, use_container_width=True)
 
+shot_types_section()
+
 ##
 ## Player stats and rankings
 ##
@@ -388,14 +427,20 @@ with st.expander('Shot Types'):
 ##
 ## Blocks/Turnover/Exclusions
 ##
-with st.expander('Blocks/Turnovers/Exclusions'):
+@st.fragment(run_every=SECTIONS_EVERY)
+def bte_section():
+    if not section_open('Blocks/Turnovers/Exclusions'):
+        return
 
-    df_bte = df_filtered[df_filtered['outcome'].isin(['Block', 'Turnover', 'Exclusion'])]
+    tables = section_inputs('bte')
 
-    df_bte_counts = df_bte.groupby(['team', 'event', 'subevent']).size().reset_index(name='count')
+
+    df_bte_counts = tables['bte']
 
     st.dataframe(df_bte_counts)
 
+bte_section()
+
 
 ##
 ## Goals across time
@@ -413,13 +458,51 @@ with st.expander('Blocks/Turnovers/Exclusions'):
 ## Momentum chart 
 ##
 
+# Exponentially weighted outcome score per team over match time: computed once per upload,
+# or read from the tracker of the match session
+@st.fragment(run_every=SECTIONS_EVERY)
+def momentum_section():
+    if not section_open('Momentum'):
+        return
+
+    if "my_data" in st.session_state:
+        df_momentum = match_momentum(data_hash, df)
+    elif session is not None:
+        df_momentum = memo("momentum", data_version(), session.momentum_frame)
+    else:
+        df_momentum = None
+
+    if df_momentum is None or df_momentum.empty:
+        st.info("No timed events yet.")
+    else:
+        fig1 = cached_figure('momentum', lambda: momentum_figure(df_momentum))
+        st.plotly_chart(fig1, use_container_width=True)
+
+momentum_section()
+
 ##
 ## Passmap chart 
 ## 
 
-st.dataframe(df_filtered)
+# Events of the selected period
+@st.fragment(run_every=SECTIONS_EVERY)
+def event_table_section():
+    if not section_open('Event Log', value=True):
+        return
+
+    df_live = current_frame()
+
+    # Filter dataframe
+    if period != "All":
+        df_filtered = df_live[df_live["period"] == period]
+    else:
+        df_filtered = df_live
+
+    st.dataframe(df_filtered)
+
+event_table_section()
 
 if "my_data" in st.session_state and st.button("Clear data"):
     del st.session_state.my_data
-    st.experimental_rerun()
-
+    del st.session_state.my_data_hash
+    st.rerun()
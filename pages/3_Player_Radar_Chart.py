@@ -0,0 +1,114 @@
+import streamlit as st
+import plotly.graph_objects as go
+import os
+from functions.datasets import CLEANED_DATA, source_signature
+from functions.player_percentiles import RADAR_CATEGORIES, shared_percentile_matrix
+from functions.figure_cache import shared_figure_cache
+
+st.title("Radar Chart for Champions League Players - Season 2024/25")
+
+# Percentile ranks of every player in every radar category - built once per process from the
+# shared cleaned dataset (the same memory-mapped frame the heatmap uses)
+if not os.path.exists(CLEANED_DATA):
+    st.error(f"Cleaned dataset not found: {os.path.basename(CLEANED_DATA)}")
+    st.stop()
+dataset_signature = source_signature(CLEANED_DATA)
+percentile_matrix = shared_percentile_matrix(CLEANED_DATA, dataset_signature)
+
+# Radar figures keyed by (dataset, matrix version, players, categories)
+figure_cache = shared_figure_cache()
+
+# Percentile rank and raw score of a player for every radar category - a row lookup in the matrix
+def get_player_stats(player_name):
+    return percentile_matrix.lookup(player_name)
+
+#Add 'and' before the last player name in the title   
+def format_names(names):
+    if len(names) == 0:
+        return ""
+    elif len(names) == 1:
+        return names[0]
+    else:
+        return ', '.join(names[:-1]) + ' and ' + names[-1]
+
+# Build the radar figure for the selected players' (percentile, raw score) stats
+def build_radar_figure(player_names, player_stats_complete, selected_categories):
+    fig = go.Figure()
+
+    zipped = list(zip(player_names, player_stats_complete))  # Combine player names and stats
+    for player in zipped:
+        player_name = player[0]
+        stats = player[1]
+
+        r_values = [stat[0] for stat in stats] + [stats[0][0]]  # Close the loop
+        customdata_values = [stat[1] for stat in stats] + [stats[0][1]]
+
+        fig.add_trace(go.Scatterpolar(
+            r=r_values,
+            customdata=customdata_values,
+            theta=selected_categories + [selected_categories[0]],
+            fill='toself',
+            name=player_name,
+            hovertemplate=
+                '<b>%{theta}</b><br>' +
+                'Percentile Rank: %{r}<br>' +
+                'Raw Score: %{customdata}<extra></extra>'
+    ))
+
+    # Update the layout
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, max(
+                    (max((stat[0] for stat in player_values), default=0) for player_values in player_stats_complete),
+                    default=0
+                ) + 5]
+  # Adjust range dynamically
+            )
+        ),
+        showlegend=True,
+        legend=dict(
+            x=0.2,
+            y=0.5,
+            xanchor='left',
+            yanchor='middle',
+            orientation='v'
+        ),
+        title=f"Radar Chart for {format_names(player_names)}"
+    )
+
+    return fig
+
+# Player selection - ordered alphabetically and with multi-select
+player_names = st.multiselect(
+    "Players",
+    percentile_matrix.players,
+    default=percentile_matrix.players[:2],  # Default value: first 2 alphabetically
+)
+
+# Radar chart categories
+selected_categories = st.multiselect(
+    "Categories",
+    list(RADAR_CATEGORIES),
+    default=['Exclusions', 'Assists', 'Shots'],  # Default selected values
+)
+
+# Check if player names and selected categories are provided
+if not player_names or not selected_categories:
+    st.subheader("Please select a player and categories to display the radar chart...")
+    st.stop()
+
+player_stats_complete = []
+for player_name in player_names:
+    jugador_stats = get_player_stats(player_name)
+    player_stats_complete.append([jugador_stats[category] for category in selected_categories])
+
+# Identical selections reuse the cached figure instead of rebuilding it
+fig = figure_cache.get_or_build(
+    ("radar", dataset_signature, percentile_matrix.version, tuple(player_names), tuple(selected_categories)),
+    lambda: build_radar_figure(player_names, player_stats_complete, selected_categories),
+)
+
+st.plotly_chart(fig, use_container_width=True)
+st.subheader(f"Radar chart for {format_names(player_names)} with the following categories: {format_names(selected_categories)}")
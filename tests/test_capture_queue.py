@@ -0,0 +1,94 @@
+import threading
+import time
+
+from functions.capture_queue import CaptureQueue, event_key
+
+
+class FakeStore:
+    """EventStore stand-in: rows in a list, switchable outage, optional gate holding inserts."""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+        self.gate = None  # threading.Event an insert waits on
+        self.inserting = threading.Event()
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("database unavailable")
+
+    def insert_events(self, rows):
+        self.inserting.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        self._check()
+        self.rows.extend(rows)
+
+    def delete_event(self, match, writer, seq):
+        self._check()
+        self.rows = [row for row in self.rows if event_key(row) != (match, writer, seq)]
+
+    def latest_match(self):
+        return self.rows[-1]["match"] if self.rows else None
+
+    def load_events(self, match=None):
+        return [row for row in self.rows if match is None or row["match"] == match]
+
+
+def event(seq, match="M1", writer="a"):
+    return {"match": match, "writer": writer, "seq": seq, "event": "Shot"}
+
+
+def make_queue(store):
+    return CaptureQueue(store, flush_interval=0.01, attempts=2)
+
+
+def test_undo_while_its_batch_is_being_written():
+    store = FakeStore()
+    store.gate = threading.Event()
+    queue = make_queue(store)
+    queue.enqueue(event(1))
+    queue.enqueue(event(2))
+    assert store.inserting.wait(2)
+
+    started = time.monotonic()
+    queue.cancel("M1", "a", 2)
+    assert time.monotonic() - started < 0.5  # does not wait for the batch
+    assert queue.pending() == [event(1)]
+
+    store.gate.set()
+    assert queue.flush(timeout=2)
+    assert store.rows == [event(1)]
+    queue.close()
+
+
+def test_cancel_while_storage_is_down_is_applied_after_recovery():
+    store = FakeStore()
+    queue = make_queue(store)
+    queue.enqueue(event(1))
+    queue.enqueue(event(2, match="M2"))
+    assert queue.flush(timeout=2)
+
+    store.down = True
+    queue.cancel("M1", "a", 1)  # must not touch the store
+    assert queue.load_events("M1") == []
+    assert queue.status()["pending_deletes"] == 1
+
+    store.down = False
+    assert queue.flush(timeout=2)
+    assert store.rows == [event(2, match="M2")]
+    queue.close()
+
+
+def test_cancel_of_a_buffered_event_never_reaches_the_store():
+    store = FakeStore()
+    store.down = True
+    queue = make_queue(store)
+    for seq in (1, 2, 3):
+        queue.enqueue(event(seq))
+    queue.cancel("M1", "a", 2)
+
+    store.down = False
+    assert queue.flush(timeout=2)
+    assert store.rows == [event(1), event(3)]
+    queue.close()
@@ -0,0 +1,12 @@
+import io
+
+from functions.ingest import read_events_csv
+
+
+def test_zero_padded_clock_stays_minutes_and_seconds():
+    csv = b"match,period,time,team,result,player_in_attack\nM1,1st,07:45,Home,Goal,3\nM1,2nd,12:34,Away,None,\n"
+    df = read_events_csv(io.BytesIO(csv))
+    assert df["time"].tolist() == ["07:45", "12:34"]
+    assert df["time_seconds"].tolist() == [465.0, 754.0]
+    assert df["outcome"].astype(str).tolist() == ["Goal", "None"]
+    assert df["player_in_attack"].isna().tolist() == [False, True]
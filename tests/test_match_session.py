@@ -0,0 +1,44 @@
+from functions.match_session import MatchRegistry, MatchSession
+
+
+def shot(time, period="1st", team="Home"):
+    return {"match": "M1", "period": period, "time": time, "team": team, "event": "Shot"}
+
+
+def test_rows_merge_by_period_and_clock_not_arrival():
+    session = MatchSession("M1")
+    session.add("a", shot("5:00", "2nd"))
+    session.add("b", shot("7:30"))
+    session.add("a", shot("2:10"))
+    session.add("b", shot("7:30", team="Away"))  # same clock: capture order
+    frame = session.to_frame()
+    assert list(zip(frame["period"], frame["time"], frame["team"])) == [
+        ("1st", "2:10", "Home"), ("1st", "7:30", "Home"), ("1st", "7:30", "Away"), ("2nd", "5:00", "Home"),
+    ]
+
+
+def test_in_order_events_extend_the_log_and_undo_rebuilds_it():
+    session = MatchSession("M1")
+    for time in ["1:00", "2:00", "3:00"]:
+        session.add("a", shot(time))
+    assert session.to_frame()["time"].tolist() == ["1:00", "2:00", "3:00"]
+    session.add("a", shot("4:00"))
+    assert session.to_frame()["time"].tolist() == ["1:00", "2:00", "3:00", "4:00"]
+    session.undo("a")
+    assert session.to_frame()["time"].tolist() == ["1:00", "2:00", "3:00"]
+
+
+def test_reseed_after_eviction_keeps_writer_seqs_and_changes_token():
+    registry = MatchRegistry(max_idle=0)  # every other session is idle by the next lookup
+    first = registry.session("M1")
+    kept = first.add("a", shot("1:00"))
+    undone = first.add("a", shot("2:00"))
+    first.undo("a")  # its delete may still be queued when the session is reseeded
+
+    registry.session("M2")
+    assert registry.get("M1") is None
+
+    second = registry.session("M1", loader=lambda match: [kept])
+    assert second is not first and second.token != first.token
+    assert second.rows() == [kept]
+    assert second.add("a", shot("3:00"))["seq"] == undone["seq"] + 1